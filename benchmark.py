@@ -0,0 +1,175 @@
+import argparse
+import importlib
+import inspect
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+from solver import SolveStats, parse_puzzle
+
+CORPORA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+CORPORA = ["easy", "17clue", "hardest"]
+SOLVERS = {
+    "bitmask": ("solver", "solve_board_bitmask"),
+    "dlx": ("solver", "solve_board_dlx"),
+    "image_upload": ("image_upload", "solve"),
+}
+METRICS = ["median_ms", "p99_ms", "max_ms"]
+
+
+def load_corpus(name):
+    with open(os.path.join(CORPORA_DIR, name + ".txt")) as f:
+        return [parse_puzzle(line) for line in f if line.strip() and not line.startswith("#")]
+
+
+def is_solution(puzzle, board):
+    for i in range(9):
+        for j in range(9):
+            if puzzle[i][j] and puzzle[i][j] != board[i][j]:
+                return False
+    digits = set(range(1, 10))
+    for k in range(9):
+        if set(board[k]) != digits or {board[r][k] for r in range(9)} != digits:
+            return False
+        r0, c0 = (k // 3) * 3, (k % 3) * 3
+        if {board[r0 + r][c0 + c] for r in range(3) for c in range(3)} != digits:
+            return False
+    return True
+
+
+def _time_one(module, func, puzzle, repeat):
+    solve = getattr(importlib.import_module(module), func)
+    best = None
+    for _ in range(repeat):
+        board = [row[:] for row in puzzle]
+        # Fixed seed so solvers with a randomized value order are comparable run to run.
+        random.seed(0)
+        start = time.perf_counter()
+        solve(board)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    nodes = None
+    if "stats" in inspect.signature(solve).parameters:
+        stats = SolveStats()
+        random.seed(0)
+        solve([row[:] for row in puzzle], stats=stats)
+        nodes = stats.nodes
+    return best, board, nodes
+
+
+def run_solver(name, puzzles, timeout, repeat=1):
+    """Time ``name`` on each puzzle in a child process so runaway searches can be killed.
+
+    Each puzzle's latency is the best of ``repeat`` runs.
+    """
+    module, func = SOLVERS[name]
+    latencies = []
+    nodes = []
+    failed = timeouts = 0
+    pool = multiprocessing.Pool(1)
+    try:
+        for puzzle in puzzles:
+            job = pool.apply_async(_time_one, (module, func, puzzle, repeat))
+            try:
+                elapsed, board, node_count = job.get(timeout)
+            except multiprocessing.TimeoutError:
+                pool.terminate()
+                pool = multiprocessing.Pool(1)
+                timeouts += 1
+                latencies.append(timeout)
+                continue
+            latencies.append(elapsed)
+            if node_count is not None:
+                nodes.append(node_count)
+            if not is_solution(puzzle, board):
+                failed += 1
+    finally:
+        pool.terminate()
+    return summarize(latencies, nodes, failed, timeouts)
+
+
+def summarize(latencies, nodes, failed, timeouts):
+    ordered = sorted(latencies)
+    total = sum(ordered)
+    p99 = ordered[max(0, math.ceil(0.99 * len(ordered)) - 1)]
+    return {
+        "count": len(ordered),
+        "failed": failed,
+        "timeouts": timeouts,
+        "median_ms": statistics.median(ordered) * 1000,
+        "p99_ms": p99 * 1000,
+        "max_ms": ordered[-1] * 1000,
+        "puzzles_per_sec": len(ordered) / total if total else 0.0,
+        "nodes": sum(nodes) if nodes else None,
+        "median_nodes": statistics.median(nodes) if nodes else None,
+    }
+
+
+def compare(current, baseline, threshold):
+    """Return a list of regression messages for metrics more than ``threshold`` percent worse."""
+    regressions = []
+    for solver_name, corpora in current["results"].items():
+        for corpus, stats in corpora.items():
+            base = baseline.get("results", {}).get(solver_name, {}).get(corpus)
+            if base is None:
+                continue
+            for metric in METRICS:
+                limit = base[metric] * (1 + threshold / 100)
+                if stats[metric] > limit:
+                    regressions.append(f"{solver_name}/{corpus} {metric}: {base[metric]:.3f} -> {stats[metric]:.3f}")
+            if stats["failed"] + stats["timeouts"] > base["failed"] + base["timeouts"]:
+                regressions.append(f"{solver_name}/{corpus}: more failures than baseline")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Sudoku solvers on the bundled corpora.")
+    parser.add_argument("--solvers", nargs="+", choices=sorted(SOLVERS), default=["bitmask", "dlx"])
+    parser.add_argument("--corpora", nargs="+", choices=CORPORA, default=CORPORA)
+    parser.add_argument("--timeout", type=float, default=10.0, help="per-puzzle timeout in seconds")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per puzzle; the fastest is kept")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed regression in percent")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for solver_name in args.solvers:
+        try:
+            importlib.import_module(SOLVERS[solver_name][0])
+        except ImportError as e:
+            print(f"skipping {solver_name}: {e}", file=sys.stderr)
+            continue
+        results[solver_name] = {}
+        for corpus in args.corpora:
+            stats = run_solver(solver_name, load_corpus(corpus), args.timeout, args.repeat)
+            results[solver_name][corpus] = stats
+            print(f"{solver_name:>12} {corpus:>8}  n={stats['count']:<4} median={stats['median_ms']:9.3f}ms "
+                  f"p99={stats['p99_ms']:9.3f}ms max={stats['max_ms']:9.3f}ms "
+                  f"rate={stats['puzzles_per_sec']:9.1f}/s nodes={stats['nodes']} failed={stats['failed']} timeouts={stats['timeouts']}")
+
+    report = {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for message in regressions:
+            print("REGRESSION " + message, file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
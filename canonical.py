@@ -0,0 +1,117 @@
+import sys
+from collections import namedtuple
+
+Transform = namedtuple("Transform", ["transpose", "rows", "cols", "digits"])
+
+# Cells are compared band 0 column by column first, then the remaining rows in
+# reading order. Any fixed order gives a valid canonical form; this one fixes
+# all nine digit labels after three cells, which keeps the set of tied
+# candidate transforms small instead of letting row 0 branch over 1296 column
+# permutations before anything is pruned.
+_ORDER = [(r, c) for c in range(9) for r in range(3)] + [(r, c) for r in range(3, 9) for c in range(9)]
+# Real puzzles keep a few hundred tied candidates at most; nearly empty boards
+# tie on almost every transform, so past this many the search gives up.
+MAX_FRONTIER = 4096
+_IDENTITY = Transform(False, tuple(range(9)), tuple(range(9)), tuple(range(10)))
+
+
+def _choices(chosen):
+    n = len(chosen)
+    if n % 3 == 0:
+        used = {x // 3 for x in chosen}
+        return [x for x in range(9) if x // 3 not in used]
+    band = chosen[n - n % 3] // 3
+    return [x for x in range(band * 3, band * 3 + 3) if x not in chosen]
+
+
+def canonical_form(board):
+    """Map ``board`` to its representative under the Sudoku equivalence group.
+
+    The group is digit relabeling, band/stack permutations, row/column swaps
+    within bands/stacks and transposition. Returns (canonical_board, transform)
+    where ``apply_transform(board, transform)`` gives the canonical board and
+    ``invert_transform`` maps boards (e.g. a solution) back to the original
+    orientation. Empty cells (0) sort before any digit.
+
+    If more than MAX_FRONTIER candidate transforms stay tied (very sparse
+    boards), the board itself is returned with the identity transform, so such
+    boards only lose sharing with their equivalents.
+    """
+    flat = tuple(v for row in board for v in row)
+    transposed = tuple(flat[c * 9 + r] for r in range(9) for c in range(9))
+    frontier = [(flat, False, (), (), (0,) * 10, 1), (transposed, True, (), (), (0,) * 10, 1)]
+
+    for r, c in _ORDER:
+        best = 10
+        kept = []
+        for g, t, rows, cols, labels, nxt in frontier:
+            row_opts = [rows] if len(rows) > r else [rows + (x,) for x in _choices(rows)]
+            col_opts = [cols] if len(cols) > c else [cols + (x,) for x in _choices(cols)]
+            for rs in row_opts:
+                for cs in col_opts:
+                    v = g[rs[r] * 9 + cs[c]]
+                    if not v:
+                        out, new_labels, new_nxt = 0, labels, nxt
+                    elif labels[v]:
+                        out, new_labels, new_nxt = labels[v], labels, nxt
+                    else:
+                        out, new_nxt = nxt, nxt + 1
+                        new_labels = labels[:v] + (nxt,) + labels[v + 1:]
+                    if out < best:
+                        best = out
+                        kept = []
+                    if out == best:
+                        kept.append((g, t, rs, cs, new_labels, new_nxt))
+                        if len(kept) > MAX_FRONTIER:
+                            return [row[:] for row in board], _IDENTITY
+        frontier = kept
+
+    _, t, rows, cols, labels, nxt = frontier[0]
+    digits = list(labels)
+    for d in range(1, 10):
+        if not digits[d]:
+            digits[d] = nxt
+            nxt += 1
+    transform = Transform(t, rows, cols, tuple(digits))
+    return apply_transform(board, transform), transform
+
+
+def apply_transform(board, transform):
+    t, rows, cols, digits = transform
+    g = [list(col) for col in zip(*board)] if t else board
+    return [[digits[g[rows[i]][cols[j]]] for j in range(9)] for i in range(9)]
+
+
+def invert_transform(board, transform):
+    t, rows, cols, digits = transform
+    inverse = [0] * 10
+    for d in range(10):
+        inverse[digits[d]] = d
+    g = [[0] * 9 for _ in range(9)]
+    for i in range(9):
+        for j in range(9):
+            g[rows[i]][cols[j]] = inverse[board[i][j]]
+    return [list(col) for col in zip(*g)] if t else g
+
+
+def canonical_key(board):
+    """Return the canonical board as an 81-character string, for dedup and cache keys."""
+    return "".join(str(v) for row in canonical_form(board)[0] for v in row)
+
+
+def main():
+    """Copy 81-character puzzle lines from stdin to stdout, dropping equivalent duplicates."""
+    seen = set()
+    for line in sys.stdin:
+        text = line.strip()
+        if len(text) != 81:
+            continue
+        board = [[int(ch) if ch.isdigit() else 0 for ch in text[r * 9:r * 9 + 9]] for r in range(9)]
+        key = canonical_key(board)
+        if key not in seen:
+            seen.add(key)
+            sys.stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import os
+import tkinter as tk
+from bisect import bisect_right
+
+# "entry" builds the classic grid of 81 Entry widgets, "canvas" a single CanvasBoard.
+DEFAULT_BOARD = os.environ.get("SUDOKU_BOARD", "entry")
+CELL_SIZE = 56
+ARROWS = {"Up": (-1, 0), "Down": (1, 0), "Left": (0, -1), "Right": (0, 1)}
+_STYLE_OPTIONS = ("state", "bg", "fg", "disabledbackground", "disabledforeground")
+
+
+def _offsets(size):
+    """Left/top pixel of each row or column, with thick lines between boxes, and the total extent."""
+    offsets = []
+    pos = 0
+    for k in range(9):
+        pos += 2 if k % 3 == 0 else 1
+        offsets.append(pos)
+        pos += size
+    return offsets, pos + 2
+
+
+class CanvasCell:
+    """Entry-like handle on one CanvasBoard cell, so grid code can drive either kind of board.
+
+    Supports the subset of the Entry API the GUIs use: get/delete/insert,
+    config/cget for state and colors, and focus_set. Canvas items are only
+    touched when the visible text or colors actually change.
+    """
+
+    def __init__(self, board, row, col, rect, text):
+        self.board = board
+        self.row = row
+        self.col = col
+        self.rect = rect
+        self.text = text
+        self.value = ""
+        self.options = {"state": "normal", "bg": "white", "fg": "#000000",
+                        "disabledbackground": "white", "disabledforeground": "#000000"}
+        self.shown = ("white", "#000000")
+
+    def _index(self, index):
+        return len(self.value) if index == tk.END else int(index)
+
+    def _set_text(self, value):
+        if value != self.value:
+            self.value = value
+            self.board.itemconfigure(self.text, text=value)
+
+    def get(self):
+        return self.value
+
+    def delete(self, first, last=None):
+        if self.options["state"] == "disabled":
+            return
+        start = self._index(first)
+        end = start + 1 if last is None else self._index(last)
+        self._set_text(self.value[:start] + self.value[end:])
+
+    def insert(self, index, text):
+        if self.options["state"] == "disabled":
+            return
+        at = self._index(index)
+        self._set_text(self.value[:at] + text + self.value[at:])
+
+    def config(self, **options):
+        for key in options:
+            if key not in _STYLE_OPTIONS:
+                raise tk.TclError(f'unknown option "-{key}"')
+        self.options.update(options)
+        if self.options["state"] == "disabled":
+            shown = (self.options["disabledbackground"], self.options["disabledforeground"])
+        else:
+            shown = (self.options["bg"], self.options["fg"])
+        if shown[0] != self.shown[0]:
+            self.board.itemconfigure(self.rect, fill=shown[0])
+        if shown[1] != self.shown[1]:
+            self.board.itemconfigure(self.text, fill=shown[1])
+        self.shown = shown
+
+    configure = config
+
+    def cget(self, key):
+        return self.options[key]
+
+    def focus_set(self):
+        self.board.focus_cell(self.row, self.col)
+
+
+class CanvasBoard(tk.Canvas):
+    """A 9x9 board drawn on one Canvas with pre-created rectangle and text items.
+
+    ``cells`` mirrors the 9x9 Entry grid, so GridRenderer and the game code
+    work unchanged; restyling a cell is an item attribute change and Tk
+    redraws the whole board once per event instead of once per widget.
+    Clicks are hit-tested against the cell layout and call ``on_select(row,
+    col)``; arrow keys move from the focused cell, and every other key goes
+    to ``on_key(event)``.
+    """
+
+    def __init__(self, master, on_select=None, on_key=None, size=CELL_SIZE, font=("Helvetica", 22)):
+        offsets, total = _offsets(size)
+        super().__init__(master, width=total, height=total, bg="black",
+                         highlightthickness=0, bd=0, takefocus=1)
+        self.size = size
+        self.offsets = offsets
+        self.total = total
+        self.on_select = on_select
+        self.on_key = on_key
+        self.focused = None
+        self.cells = [[None for _ in range(9)] for _ in range(9)]
+        for i in range(9):
+            for j in range(9):
+                x, y = offsets[j], offsets[i]
+                rect = self.create_rectangle(x, y, x + size, y + size, fill="white", width=0)
+                text = self.create_text(x + size / 2, y + size / 2, text="", font=font, fill="#000000")
+                self.cells[i][j] = CanvasCell(self, i, j, rect, text)
+
+        self.bind("<Button-1>", self._on_click)
+        self.bind("<KeyPress>", self._on_keypress)
+
+    def cell_at(self, x, y):
+        """Return the (row, col) under canvas point (x, y), or None outside the board."""
+        if not (0 <= x < self.total and 0 <= y < self.total):
+            return None
+        row = max(0, min(8, bisect_right(self.offsets, y) - 1))
+        col = max(0, min(8, bisect_right(self.offsets, x) - 1))
+        return row, col
+
+    def focus_cell(self, row, col):
+        self.focused = (row, col)
+        self.focus_set()
+
+    def _select(self, row, col):
+        self.focus_cell(row, col)
+        if self.on_select:
+            self.on_select(row, col)
+
+    def _on_click(self, event):
+        cell = self.cell_at(event.x, event.y)
+        if cell is not None:
+            self._select(*cell)
+
+    def _on_keypress(self, event):
+        if event.keysym in ARROWS:
+            if self.focused is not None:
+                dr, dc = ARROWS[event.keysym]
+                row, col = self.focused[0] + dr, self.focused[1] + dc
+                if 0 <= row < 9 and 0 <= col < 9:
+                    self._select(row, col)
+            return "break"
+        if self.on_key:
+            return self.on_key(event)
+        return None
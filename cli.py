@@ -0,0 +1,64 @@
+import argparse
+import sys
+import time
+
+from solver import BACKENDS, format_board, parse_puzzle, solve_many
+
+
+def read_puzzles(paths, errors):
+    """Yield boards from line-format files (or stdin), one line at a time.
+
+    Malformed lines are reported to ``errors`` and yield None, so every
+    puzzle line still gets a result in the output.
+    """
+    for path in paths or ["-"]:
+        f = sys.stdin if path == "-" else open(path)
+        try:
+            for lineno, line in enumerate(f, 1):
+                if not line.strip() or line.startswith("#"):
+                    continue
+                try:
+                    yield parse_puzzle(line)
+                except ValueError as e:
+                    errors.write(f"{path}:{lineno}: {e}\n")
+                    yield None
+        finally:
+            if f is not sys.stdin:
+                f.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve 81-character Sudoku puzzles without a display.")
+    parser.add_argument("files", nargs="*", help="puzzle files, one per line ('-' or none for stdin)")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="worker processes (0 for all cores)")
+    parser.add_argument("--chunksize", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=None, help="per-puzzle timeout in seconds")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="bitmask")
+    parser.add_argument("--unordered", action="store_true", help="emit results as they finish, not in input order")
+    parser.add_argument("--stats", action="store_true", help="print totals and throughput to stderr")
+    args = parser.parse_args(argv)
+
+    counts = {"solved": 0, "unsolvable": 0, "timeout": 0, "invalid": 0}
+    start = time.perf_counter()
+    puzzles = read_puzzles(args.files, sys.stderr)
+    results = solve_many(puzzles, workers=args.workers or None, chunksize=args.chunksize,
+                         timeout=args.timeout, ordered=not args.unordered, backend=args.backend)
+    out = sys.stdout
+    for result in results:
+        counts[result.status] += 1
+        if result.status == "solved":
+            out.write(format_board(result.board) + "\n")
+        else:
+            out.write(result.status + "\n")
+
+    if args.stats:
+        elapsed = time.perf_counter() - start
+        total = sum(counts.values())
+        rate = total / elapsed if elapsed else 0.0
+        summary = " ".join(f"{k}={v}" for k, v in counts.items())
+        sys.stderr.write(f"puzzles={total} {summary} elapsed={elapsed:.3f}s rate={rate:.1f}/s\n")
+    return 0 if counts["solved"] == sum(counts.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
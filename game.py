@@ -1,15 +1,95 @@
+import queue
+import threading
 import tkinter as tk
 import tkinter.messagebox as messagebox
-import copy
-from solver import solve_board, is_valid
+from solver import generate_unique_puzzle
+from puzzle_bank import DEFAULT_TIERS, open_bank
+from logic_solver import PEERS, grade, level_of, next_hint
+from grid_render import GridRenderer
+from canvas_board import DEFAULT_BOARD, CanvasBoard
+
+DIFFICULTIES = DEFAULT_TIERS
+LEVEL_TRIES = 50
+TAKE_TRIES = 40
+BANK_DRAWS = 20
+
+
+def units_of(row, col):
+    """Indices of the row, column and box units containing a cell (0-8, 9-17, 18-26)."""
+    return (row, 9 + col, 18 + (row // 3) * 3 + col // 3)
+
+
+def generate_level(level, givens, tries):
+    """Generate up to ``tries`` puzzles and return the first that grades as ``level``, or None."""
+    for _ in range(tries):
+        generated = generate_unique_puzzle(givens)
+        if grade(generated.puzzle).level == level:
+            return generated
+    return None
+
+
+class PuzzleQueue:
+    """Keeps a small buffer of ready puzzles per grade level, refilled by a daemon thread.
+
+    ``levels`` maps each level name to the clue count it is generated at.
+    Every puzzle is graded and buffered under the level it actually grades
+    as; a level that gets no puzzle in ``tries`` generations is left alone
+    until the next take().
+    """
+
+    def __init__(self, levels, size=3, tries=LEVEL_TRIES):
+        self.givens = dict(levels)
+        self.tries = tries
+        self.buffers = {name: queue.Queue(maxsize=size) for name in self.givens}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._refill, daemon=True)
+        self._thread.start()
+
+    def _refill(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            misses = dict.fromkeys(self.buffers, 0)
+            progressed = True
+            while progressed and not self._stop.is_set():
+                progressed = False
+                for level, buffer in self.buffers.items():
+                    if self._stop.is_set():
+                        return
+                    if buffer.full() or misses[level] >= self.tries:
+                        continue
+                    generated = generate_unique_puzzle(self.givens[level])
+                    graded = grade(generated.puzzle).level
+                    if graded != level:
+                        misses[level] += 1
+                    target = self.buffers.get(graded)
+                    if target is not None and not target.full():
+                        target.put_nowait(generated)
+                    progressed = True
+            self._wake.wait()
+
+    def take(self, level):
+        """Return a puzzle that grades as ``level``, or None if none turned up in time."""
+        try:
+            generated = self.buffers[level].get_nowait()
+        except queue.Empty:
+            generated = generate_level(level, self.givens[level], TAKE_TRIES)
+        self._wake.set()
+        return generated
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        self._thread.join(timeout=2)
 
 
 class SudokuGame:
-    def __init__(self, root):
+    def __init__(self, root, board=DEFAULT_BOARD):
         self.root = root
         def close_on_esc(event=None):
-            self.root.destroy()
+            self.close()
         self.root.bind('<Escape>', close_on_esc)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
         self.root.title("Sudoku Game")
 
         self.btn_font = ("Helvetica", 20, "bold")
@@ -24,12 +104,18 @@ class SudokuGame:
         self.givens = [[False for _ in range(9)] for _ in range(9)]
         self.solution_board = [[0 for _ in range(9)] for _ in range(9)]
         self.current_board = [[0 for _ in range(9)] for _ in range(9)]
+        self.unit_counts = [[0] * 10 for _ in range(27)]
+        self.conflicts = set()
+        self.numbers_hidden = False
+        self.board_locked = False
         self.mistakes = 0
         self.is_paused = False
         self.elapsed_seconds = 0
         self.timer_job = None
         self.pause_overlay_btn = None
         self.pause_overlay_win = None
+        self.puzzle_queue = PuzzleQueue(DIFFICULTIES)
+        self.bank = open_bank()
 
         title = tk.Label(root, text="Sudoku Game", font=("Helvetica", 20, "bold"))
         title.pack(pady=10)
@@ -43,27 +129,33 @@ class SudokuGame:
         self.grid_frame = tk.Frame(self.grid_container, bg="black")
         self.grid_frame.pack()
 
-        for i in range(9):
-            for j in range(9):
-                entry = tk.Entry(self.grid_frame, width=2, font=("Helvetica", 22), justify='center',
-                                 highlightthickness=0, relief="flat")
-                entry.configure(insertontime=0)
+        if board == "canvas":
+            self.board_canvas = CanvasBoard(self.grid_frame, on_select=self.select_cell, on_key=self.on_keypress)
+            self.board_canvas.pack()
+            self.cells = self.board_canvas.cells
+        else:
+            for i in range(9):
+                for j in range(9):
+                    entry = tk.Entry(self.grid_frame, width=2, font=("Helvetica", 22), justify='center',
+                                     highlightthickness=0, relief="flat")
+                    entry.configure(insertontime=0)
 
-                top = 2 if i % 3 == 0 else 1
-                left = 2 if j % 3 == 0 else 1
-                bottom = 2 if i == 8 else 0
-                right = 2 if j == 8 else 0
+                    top = 2 if i % 3 == 0 else 1
+                    left = 2 if j % 3 == 0 else 1
+                    bottom = 2 if i == 8 else 0
+                    right = 2 if j == 8 else 0
 
-                entry.grid(row=i, column=j, ipadx=10, ipady=10, padx=(left, right), pady=(top, bottom))
+                    entry.grid(row=i, column=j, ipadx=10, ipady=10, padx=(left, right), pady=(top, bottom))
 
-                entry.bind("<FocusIn>", lambda e, row=i, col=j: self.select_cell(row, col))
-                entry.bind("<KeyPress>", self.on_keypress)
-                entry.bind("<Up>", lambda e, row=i, col=j: self.move_cursor(row-1, col))
-                entry.bind("<Down>", lambda e, row=i, col=j: self.move_cursor(row+1, col))
-                entry.bind("<Left>", lambda e, row=i, col=j: self.move_cursor(row, col-1))
-                entry.bind("<Right>", lambda e, row=i, col=j: self.move_cursor(row, col+1))
+                    entry.bind("<FocusIn>", lambda e, row=i, col=j: self.select_cell(row, col))
+                    entry.bind("<KeyPress>", self.on_keypress)
+                    entry.bind("<Up>", lambda e, row=i, col=j: self.move_cursor(row-1, col))
+                    entry.bind("<Down>", lambda e, row=i, col=j: self.move_cursor(row+1, col))
+                    entry.bind("<Left>", lambda e, row=i, col=j: self.move_cursor(row, col-1))
+                    entry.bind("<Right>", lambda e, row=i, col=j: self.move_cursor(row, col+1))
 
-                self.cells[i][j] = entry
+                    self.cells[i][j] = entry
+        self.renderer = GridRenderer(self.cells)
 
         self.right_frame = tk.Frame(main_frame, bg=self.default_bg)
         self.right_frame.grid(row=0, column=1, padx=(30, 10), sticky="n")
@@ -95,6 +187,8 @@ class SudokuGame:
         self.create_icon_button(util_frame, "⟲", self.clear_user_inputs, width=3).grid(row=0, column=0, padx=5)
         self.create_icon_button(util_frame, "⌫", self.erase_cell, width=3).grid(row=0, column=1, padx=5)
         self.create_icon_button(util_frame, "💡", self.hint_cell, width=3).grid(row=0, column=2, padx=5)
+        self.hint_label = tk.Label(self.right_frame, text="", font=self.small_font, fg=self.muted_fg, bg=self.default_bg)
+        self.hint_label.pack(pady=(0, 5))
 
         numbers_frame = tk.Frame(self.right_frame, bg=self.default_bg)
         numbers_frame.pack()
@@ -117,10 +211,22 @@ class SudokuGame:
         self.root.bind("<Button-1>", self.handle_root_click)
 
         try:
-           self.start_new_game(40, None)
+           self.start_new_game("Easy", None)
         except Exception:
             pass
 
+    def close(self):
+        self.puzzle_queue.close()
+        if self.bank is not None:
+            self.bank.close()
+        if self.timer_job is not None:
+            try:
+                self.root.after_cancel(self.timer_job)
+            except Exception:
+                pass
+            self.timer_job = None
+        self.root.destroy()
+
     def create_custom_button(self, parent, text, command=None, width=4, height=2,
                              bg=None, fg=None, hover_bg=None):
         bg = bg or self.default_bg
@@ -157,17 +263,10 @@ class SudokuGame:
         btn_frame = tk.Frame(dialog, bg=self.default_bg)
         btn_frame.pack(padx=10, pady=(0, 15))
 
-        options = [
-            ("Easy", 40),
-            ("Medium", 32),
-            ("Hard", 26),
-            ("Extreme", 17),
-        ]
-
-        for idx, (name, given) in enumerate(options):
+        for idx, (name, _) in enumerate(DIFFICULTIES):
             b = self.create_custom_button(btn_frame, text=name, width=8, height=1,
                                           bg="#5a7bc0", fg="white", hover_bg="#4b69ad",
-                                          command=lambda g=given, d=dialog: self.start_new_game(g, d))
+                                          command=lambda n=name, d=dialog: self.start_new_game(n, d))
             b.grid(row=0, column=idx, padx=5)
 
         dialog.update_idletasks()
@@ -175,33 +274,70 @@ class SudokuGame:
         y = self.root.winfo_y() + (self.root.winfo_height() - dialog.winfo_height()) // 2
         dialog.geometry(f"+{x}+{y}")
 
-    def start_new_game(self, givens_count, dialog):
+    def start_new_game(self, level, dialog):
         try:
             dialog.destroy()
         except Exception:
             pass
-        self.generate_puzzle(givens_count)
+        if not self.generate_puzzle(level):
+            messagebox.showwarning("New Game", f"Could not generate a {level} puzzle. Please try again.")
+            return
         self.render_board()
         self.reset_status()
         self.start_timer()
 
-    def generate_puzzle(self, givens_count):
-        solved = [[0 for _ in range(9)] for _ in range(9)]
-        solve_board(solved)
-        self.solution_board = copy.deepcopy(solved)
+    def generate_puzzle(self, level):
+        """Load a puzzle graded ``level`` from the bank or the queue; False if none was found."""
+        generated = None
+        if self.bank is not None and level in self.bank:
+            for _ in range(BANK_DRAWS):
+                entry = self.bank.random(level)
+                if level_of(entry.rating) == level:
+                    generated = entry
+                    break
+        if generated is None:
+            generated = self.puzzle_queue.take(level)
+        if generated is None:
+            return False
+        self.solution_board = generated.solution
+        self.current_board = generated.puzzle
+        for i in range(9):
+            for j in range(9):
+                self.givens[i][j] = self.current_board[i][j] != 0
+        self.reset_conflicts()
+        return True
 
-        import random
-        all_cells = [(i, j) for i in range(9) for j in range(9)]
-        cells_to_keep = set(random.sample(all_cells, max(17, min(81, givens_count))))
-        self.current_board = [[0 for _ in range(9)] for _ in range(9)]
+    def reset_conflicts(self):
+        """Rebuild the per-unit digit counts and conflict set from current_board."""
+        self.unit_counts = [[0] * 10 for _ in range(27)]
         for i in range(9):
             for j in range(9):
-                if (i, j) in cells_to_keep:
-                    self.current_board[i][j] = self.solution_board[i][j]
-                    self.givens[i][j] = True
-                else:
-                    self.current_board[i][j] = 0
-                    self.givens[i][j] = False
+                val = self.current_board[i][j]
+                if val:
+                    for u in units_of(i, j):
+                        self.unit_counts[u][val] += 1
+        self.conflicts = {(i, j) for i in range(9) for j in range(9) if self.in_conflict(i, j)}
+
+    def in_conflict(self, row, col):
+        val = self.current_board[row][col]
+        return val != 0 and any(self.unit_counts[u][val] > 1 for u in units_of(row, col))
+
+    def set_cell_value(self, row, col, num):
+        """Store ``num`` (0 to clear) and refresh conflicts for the cell and its 20 peers."""
+        old = self.current_board[row][col]
+        if old == num:
+            return
+        for u in units_of(row, col):
+            if old:
+                self.unit_counts[u][old] -= 1
+            if num:
+                self.unit_counts[u][num] += 1
+        self.current_board[row][col] = num
+        for rr, cc in [(row, col)] + [divmod(p, 9) for p in PEERS[row * 9 + col]]:
+            if self.in_conflict(rr, cc):
+                self.conflicts.add((rr, cc))
+            else:
+                self.conflicts.discard((rr, cc))
 
     def render_board(self):
         for i in range(9):
@@ -216,12 +352,16 @@ class SudokuGame:
                     entry.config(state="disabled", disabledforeground="#000000", disabledbackground="white")
                 else:
                     entry.config(state="normal", fg="#000000", bg="white")
+        self.renderer.invalidate()
+        self.numbers_hidden = False
+        self.board_locked = False
         self.selected_cell = None
         self.highlight_selection()
 
     def reset_status(self):
         self.mistakes = 0
         self.mistake_label.config(text=f"{self.mistakes}")
+        self.hint_label.config(text="")
         self.elapsed_seconds = 0
         self.timer_label.config(text="00:00")
         self.is_paused = False
@@ -325,6 +465,7 @@ class SudokuGame:
             self.pause_overlay_win = None
 
     def hide_numbers(self):
+        self.numbers_hidden = True
         for i in range(9):
             for j in range(9):
                 e = self.cells[i][j]
@@ -332,8 +473,10 @@ class SudokuGame:
                 e.delete(0, tk.END)
                 if self.givens[i][j]:
                     e.config(state="disabled", disabledbackground="white")
+        self.renderer.invalidate()
 
     def show_numbers(self):
+        self.numbers_hidden = False
         for i in range(9):
             for j in range(9):
                 e = self.cells[i][j]
@@ -344,6 +487,7 @@ class SudokuGame:
                     e.insert(0, str(val))
                 if self.givens[i][j]:
                     e.config(state="disabled", disabledforeground="#000000", disabledbackground="white")
+        self.renderer.invalidate()
 
     def select_cell(self, row, col):
         self.selected_cell = (row, col)
@@ -372,20 +516,13 @@ class SudokuGame:
         r, c = self.selected_cell
         if self.givens[r][c]:
             return
-        correct = self.solution_board[r][c]
-        entry = self.cells[r][c]
-        entry.config(state="normal")
-        if num == correct:
-            self.current_board[r][c] = num
-            entry.delete(0, tk.END)
-            entry.insert(0, str(num))
-            entry.config(bg="white", fg="#000000")
-        else:
+        if num != self.solution_board[r][c]:
             self.mistakes += 1
             self.mistake_label.config(text=f"{self.mistakes}")
-            self.current_board[r][c] = num
-            entry.delete(0, tk.END)
-            entry.insert(0, str(num))
+        self.set_cell_value(r, c, num)
+        entry = self.cells[r][c]
+        entry.delete(0, tk.END)
+        entry.insert(0, str(num))
         self.highlight_selection()
         self.check_game_finished()
 
@@ -395,10 +532,8 @@ class SudokuGame:
         r, c = self.selected_cell
         if self.givens[r][c]:
             return
-        self.current_board[r][c] = 0
-        e = self.cells[r][c]
-        e.config(state="normal")
-        e.delete(0, tk.END)
+        self.set_cell_value(r, c, 0)
+        self.cells[r][c].delete(0, tk.END)
         self.highlight_selection()
 
     def clear_user_inputs(self):
@@ -407,27 +542,41 @@ class SudokuGame:
         for i in range(9):
             for j in range(9):
                 if not self.givens[i][j]:
-                    self.current_board[i][j] = 0
-                    e = self.cells[i][j]
-                    e.config(state="normal")
-                    e.delete(0, tk.END)
-                    e.config(bg="white", fg="#000000")
+                    self.set_cell_value(i, j, 0)
+                    self.cells[i][j].delete(0, tk.END)
         self.highlight_selection()
 
     def hint_cell(self):
-        if self.is_paused or not self.selected_cell:
+        if self.is_paused:
             return
-        r, c = self.selected_cell
-        if self.givens[r][c]:
+        wrong = [(i, j) for i in range(9) for j in range(9)
+                 if self.current_board[i][j] and self.current_board[i][j] != self.solution_board[i][j]]
+        if wrong:
+            self.selected_cell = self.selected_cell if self.selected_cell in wrong else wrong[0]
+            self.hint_label.config(text="This entry is wrong")
+            self.highlight_selection()
             return
-        if self.current_board[r][c] == 0:
+        # Only givens and correct entries reach the logic solver, so every
+        # deduction it makes is consistent with solution_board.
+        board = [[v if self.givens[i][j] or v == self.solution_board[i][j] else 0
+                  for j, v in enumerate(row)] for i, row in enumerate(self.current_board)]
+        step = next_hint(board)
+        placement = step.placements[0] if step is not None else None
+        if placement and placement[2] == self.solution_board[placement[0]][placement[1]]:
+            r, c, num = placement
+            self.hint_label.config(text=step.technique.replace("_", " ").capitalize())
+        else:
+            empty = [(i, j) for i in range(9) for j in range(9) if not self.current_board[i][j]]
+            if not empty:
+                return
+            r, c = self.selected_cell if self.selected_cell in empty else empty[0]
             num = self.solution_board[r][c]
-            self.current_board[r][c] = num
-            e = self.cells[r][c]
-            e.config(state="normal")
-            e.delete(0, tk.END)
-            e.insert(0, str(num))
-            e.config(bg="white", fg="#000000")
+            self.hint_label.config(text="")
+        self.set_cell_value(r, c, num)
+        e = self.cells[r][c]
+        e.delete(0, tk.END)
+        e.insert(0, str(num))
+        self.selected_cell = (r, c)
         self.highlight_selection()
         self.check_game_finished()
 
@@ -469,19 +618,13 @@ class SudokuGame:
         except Exception:
             pass
 
-        for i in range(9):
-            for j in range(9):
-                cell = self.cells[i][j]
-                try:
-                    cell.config(state="normal")
-                    cell.config(fg="#000000", bg="white")
-                    cell.config(state="disabled", disabledforeground="#000000", disabledbackground="white")
-                except Exception:
-                    pass
+        self.board_locked = True
+        self.selected_cell = None
+        self.highlight_selection()
 
     def handle_root_click(self, event):
         widget = event.widget
-        if isinstance(widget, tk.Entry):
+        if isinstance(widget, (tk.Entry, CanvasBoard)):
             return
         if isinstance(widget, tk.Button):
             if widget['text'] in [str(i) for i in range(1, 10)] + ["⌫", "⟲", "💡", "New Game", "⏸", "⏵"]:
@@ -490,108 +633,36 @@ class SudokuGame:
         self.highlight_selection()
 
     def highlight_selection(self):
-        for i in range(9):
-            for j in range(9):
-                e = self.cells[i][j]
-                if self.givens[i][j]:
-                    e.config(state="disabled", disabledforeground="#000000", disabledbackground="white")
-                else:
-                    e.config(bg="white", fg="#000000")
-
+        conflicts = set() if self.numbers_hidden else self.conflicts
+        row = col = None
+        selected_val = 0
         if self.selected_cell:
             row, col = self.selected_cell
-            for i in range(9):
-                if self.givens[row][i]:
-                    self.cells[row][i].config(state="disabled", disabledbackground="#e0f0ff")
-                else:
-                    self.cells[row][i].config(bg="#e0f0ff")
-                if self.givens[i][col]:
-                    self.cells[i][col].config(state="disabled", disabledbackground="#e0f0ff")
-                else:
-                    self.cells[i][col].config(bg="#e0f0ff")
-            start_row = (row // 3) * 3
-            start_col = (col // 3) * 3
-            for i in range(start_row, start_row + 3):
-                for j in range(start_col, start_col + 3):
-                    if self.givens[i][j]:
-                        self.cells[i][j].config(state="disabled", disabledbackground="#e0f0ff")
-                    else:
-                        self.cells[i][j].config(bg="#e0f0ff")
-
-            selected_val = self.cells[row][col].get()
-            if selected_val:
-                for i in range(9):
-                    for j in range(9):
-                        if (i, j) == (row, col):
-                            continue
-                        if self.cells[i][j].get() == selected_val:
-                            same_num_bg = "#cfe4ff"
-                            if self.givens[i][j]:
-                                self.cells[i][j].config(
-                                    state="disabled",
-                                    disabledbackground=same_num_bg,
-                                )
-                            else:
-                                self.cells[i][j].config(bg=same_num_bg)
+            if not self.numbers_hidden:
+                selected_val = self.current_board[row][col]
 
+        styles = []
         for i in range(9):
+            style_row = []
             for j in range(9):
-                val = self.cells[i][j].get()
-                if not val:
-                    continue
-
-                def mark_conflict_cell(rr, cc):
-                    cell = self.cells[rr][cc]
-                    is_selected = self.selected_cell and (rr, cc) == self.selected_cell
-                    if self.givens[rr][cc]:
-                        cell.config(
-                            state="disabled",
-                            disabledbackground="#fddede",
-                            disabledforeground="red",
-                        )
-                    else:
-                        if is_selected:
-                            cell.config(fg="red")
-                        else:
-                            cell.config(bg="#fddede", fg="red")
-
-                for k in range(9):
-                    if k != j and self.cells[i][k].get() == val:
-                        mark_conflict_cell(i, j)
-                        mark_conflict_cell(i, k)
-                for k in range(9):
-                    if k != i and self.cells[k][j].get() == val:
-                        mark_conflict_cell(i, j)
-                        mark_conflict_cell(k, j)
-                box_row = (i // 3) * 3
-                box_col = (j // 3) * 3
-                for r in range(box_row, box_row + 3):
-                    for c in range(box_col, box_col + 3):
-                        if (r != i or c != j) and self.cells[r][c].get() == val:
-                            mark_conflict_cell(i, j)
-                            mark_conflict_cell(r, c)
+                bg, fg = "white", "#000000"
+                if row is not None:
+                    if i == row or j == col or (i // 3 == row // 3 and j // 3 == col // 3):
+                        bg = "#e0f0ff"
+                    if selected_val and self.current_board[i][j] == selected_val:
+                        bg = "#cfe4ff"
+                if (i, j) in conflicts:
+                    bg, fg = "#fddede", "red"
+                if (i, j) == self.selected_cell:
+                    bg = "#a5d8ff"
+                state = "disabled" if self.givens[i][j] or self.board_locked else "normal"
+                style_row.append((state, bg, fg))
+            styles.append(style_row)
+        self.renderer.render(styles)
 
         if self.selected_cell:
-            row, col = self.selected_cell
-            e = self.cells[row][col]
-            is_conflict = False
-            try:
-                is_conflict = (e.cget("fg") == "red")
-            except Exception:
-                pass
-            if self.givens[row][col]:
-                e.config(
-                    state="disabled",
-                    disabledbackground="#a5d8ff",
-                    disabledforeground="red" if is_conflict else "#000000",
-                )
-            else:
-                e.config(
-                    bg="#a5d8ff",
-                    fg="red" if is_conflict else "#000000",
-                )
             try:
-                e.focus_set()
+                self.cells[row][col].focus_set()
             except Exception:
                 pass
 
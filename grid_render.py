@@ -0,0 +1,49 @@
+import tkinter as tk
+
+
+class GridRenderer:
+    """Applies per-cell (state, bg, fg) styles to a 9x9 grid of Entry widgets.
+
+    The last style sent to each cell is remembered, so ``render`` only calls
+    ``config()`` on cells whose style actually changed. Code that configures a
+    cell directly must call ``invalidate`` so the next render repaints it.
+    """
+
+    def __init__(self, cells):
+        self.cells = cells
+        self.applied = [[None] * 9 for _ in range(9)]
+        self._options = {}
+
+    def options(self, style):
+        opts = self._options.get(style)
+        if opts is None:
+            state, bg, fg = style
+            if state == "disabled":
+                opts = {"state": state, "disabledbackground": bg, "disabledforeground": fg}
+            else:
+                opts = {"state": state, "bg": bg, "fg": fg}
+            self._options[style] = opts
+        return opts
+
+    def render(self, styles):
+        """Push ``styles`` (9x9 of (state, bg, fg)); return the number of cells reconfigured."""
+        changed = 0
+        for i in range(9):
+            applied = self.applied[i]
+            for j in range(9):
+                style = styles[i][j]
+                if style != applied[j]:
+                    try:
+                        self.cells[i][j].config(**self.options(style))
+                    except tk.TclError:
+                        continue
+                    applied[j] = style
+                    changed += 1
+        return changed
+
+    def invalidate(self, row=None, col=None):
+        """Forget what was applied to one cell, or to every cell when no position is given."""
+        if row is None:
+            self.applied = [[None] * 9 for _ in range(9)]
+        else:
+            self.applied[row][col] = None
@@ -1,14 +1,24 @@
+import queue
+import threading
+import time
 import tkinter as tk
-from tkinter import filedialog, messagebox
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import filedialog, messagebox, ttk
 import cv2
 import numpy as np
 import pytesseract
 from PIL import Image, ImageTk
+from solver import SearchAborted, default_cache, solve_iterative
 
 pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+SOLVE_TIMEOUT = 5.0
+STAGES = ["Load", "Detect", "Warp", "Recognize", "Solve", "Render"]
+POLL_MS = 50
 
 def preprocess_image(img_path):
     img = cv2.imread(img_path)
+    if img is None:
+        raise ValueError(f"Could not read image {img_path}")
     img = cv2.resize(img, (600, 600))
     gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
     blur = cv2.GaussianBlur(gray, (5, 5), 1)
@@ -56,17 +66,21 @@ def split_cells(img):
         cells.append(cols)
     return cells
 
-def extract_digits(cells):
+def extract_digits(cells, progress=None, cancel=None):
     board = []
     for row in cells:
         line = []
         for cell in row:
+            if cancel is not None and cancel.is_set():
+                raise SearchAborted("cancelled")
             cell = cell[5:-5, 5:-5]
             _, bin_cell = cv2.threshold(cell, 100, 255, cv2.THRESH_BINARY_INV)
             config = r'--psm 10 -c tessedit_char_whitelist=123456789'
             text = pytesseract.image_to_string(bin_cell, config=config)
             digit = ''.join(filter(str.isdigit, text))
             line.append(int(digit) if digit else 0)
+            if progress is not None:
+                progress((len(board) * 9 + len(line)) / 81)
         board.append(line)
     return board
 
@@ -93,7 +107,9 @@ def is_valid(b, num, pos):
                 return False
     return True
 
-def solve(board):
+def solve(board, stats=None, depth=0):
+    if stats is not None:
+        stats.enter(depth)
     empty = find_empty(board)
     if not empty:
         return True
@@ -101,9 +117,15 @@ def solve(board):
     for num in range(1, 10):
         if is_valid(board, num, (row, col)):
             board[row][col] = num
-            if solve(board):
+            if stats is not None:
+                stats.guesses += 1
+                stats.placed(row, col, num)
+            if solve(board, stats, depth + 1):
                 return True
             board[row][col] = 0
+            if stats is not None:
+                stats.backtracks += 1
+                stats.removed(row, col, num)
     return False
 
 def draw_solution(warp, board, original):
@@ -116,16 +138,69 @@ def draw_solution(warp, board, original):
                 cv2.putText(warp, text, pos, cv2.FONT_HERSHEY_SIMPLEX, 1.5, (192, 123, 90), 2)
     return warp
 
+def run_pipeline(img_path, report, cancel):
+    """Load, detect, warp, recognize, solve and render ``img_path`` on the calling thread.
+
+    ``report(kind, *args)`` receives ("progress", stage, fraction) updates,
+    with ``stage`` indexing STAGES, and ("preview", warped) as soon as the
+    grid has been straightened. ``cancel`` is a threading.Event checked
+    between stages, OCR cells and solver nodes. Returns (outcome, solved_image
+    or None); raises SearchAborted when cancelled and ValueError when the image
+    or grid cannot be found.
+    """
+    def begin(stage):
+        if cancel.is_set():
+            raise SearchAborted("cancelled")
+        report("progress", stage, 0.0)
+
+    begin(0)
+    img, thresh = preprocess_image(img_path)
+    report("progress", 0, 1.0)
+
+    begin(1)
+    contour = find_sudoku_contour(thresh)
+    if contour.size == 0:
+        raise ValueError("Sudoku grid not found!")
+    report("progress", 1, 1.0)
+
+    begin(2)
+    warped = warp_image(img, contour)
+    warped_gray = cv2.cvtColor(warped, cv2.COLOR_BGR2GRAY)
+    report("preview", warped)
+    report("progress", 2, 1.0)
+
+    begin(3)
+    puzzle = extract_digits(split_cells(warped_gray), lambda done: report("progress", 3, done), cancel)
+    original = [row[:] for row in puzzle]
+
+    begin(4)
+    outcome = solve_iterative(puzzle, deadline=time.monotonic() + SOLVE_TIMEOUT, cancel=cancel, cache=default_cache)
+    if outcome.reason == "cancelled":
+        raise SearchAborted("cancelled")
+    report("progress", 4, 1.0)
+
+    begin(5)
+    solved_img = draw_solution(warped.copy(), puzzle, original) if outcome.status == "solved" else None
+    report("progress", 5, 1.0)
+    return outcome, solved_img
+
 # --- GUI ---
 
 class SudokuApp:
     def __init__(self, root):
         self.root = root
         def close_on_esc(event=None):
-            self.root.destroy()
+            self.close()
         self.root.bind('<Escape>', close_on_esc)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
         self.root = root
         self.root.title("Sudoku Solver")
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.events = queue.Queue()
+        self.cancel_event = None
+        self.progress_frame = None
+        self.progress_bars = []
+        self._poll_job = None
         # Increase the size of the Image Upload window (width x height)
         # Adjust these values if you want it bigger or smaller.
         self.root.geometry("250x180")
@@ -150,26 +225,86 @@ class SudokuApp:
         self.upload_btn.bind("<Enter>", on_enter)
         self.upload_btn.bind("<Leave>", on_leave)
 
+    def close(self):
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+        self.executor.shutdown(wait=False)
+        self.root.destroy()
+
     def upload_image(self):
+        if self.cancel_event is not None:
+            return
         file_path = filedialog.askopenfilename(filetypes=[("Image Files", "*.png;*.jpg;*.jpeg")])
         if not file_path:
             return
 
-        img, thresh = preprocess_image(file_path)
-        contour = find_sudoku_contour(thresh)
+        self.cancel_event = threading.Event()
+        self.events = queue.Queue()
+        self.upload_btn.config(state="disabled")
+        self.show_progress()
+        self.root.geometry("")
+        self.executor.submit(self.pipeline_worker, file_path, self.events, self.cancel_event)
+        self._poll_job = self.root.after(POLL_MS, self.poll_pipeline)
 
-        if contour.size == 0:
-            messagebox.showerror("Error", "Sudoku grid not found!")
-            return
+    def pipeline_worker(self, file_path, events, cancel):
+        """Runs on the executor thread; results reach Tk only through ``events``."""
+        try:
+            outcome, solved_img = run_pipeline(file_path, lambda *event: events.put(event), cancel)
+        except SearchAborted:
+            events.put(("cancelled",))
+        except ValueError as e:
+            events.put(("failed", str(e)))
+        except Exception as e:
+            events.put(("failed", f"Image processing failed: {e}"))
+        else:
+            events.put(("done", outcome, solved_img))
+
+    def show_progress(self):
+        if self.progress_frame is not None:
+            self.progress_frame.destroy()
+        self.progress_frame = tk.Frame(self.root)
+        self.progress_frame.pack(pady=(0, 10))
+        self.progress_bars = []
+        for idx, name in enumerate(STAGES):
+            tk.Label(self.progress_frame, text=name, font=self.btn_font, anchor="w", width=10).grid(row=idx, column=0, sticky="w")
+            bar = ttk.Progressbar(self.progress_frame, length=160, maximum=1.0)
+            bar.grid(row=idx, column=1, pady=2)
+            self.progress_bars.append(bar)
+        tk.Button(self.progress_frame, text="Cancel", font=self.btn_font, relief="flat", borderwidth=0,
+                  highlightthickness=0, command=self.cancel_pipeline).grid(row=len(STAGES), column=0, columnspan=2, pady=(5, 0))
+
+    def cancel_pipeline(self):
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+
+    def poll_pipeline(self):
+        self._poll_job = None
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                self._poll_job = self.root.after(POLL_MS, self.poll_pipeline)
+                return
+            kind = event[0]
+            if kind == "progress":
+                self.progress_bars[event[1]]["value"] = event[2]
+            elif kind == "preview":
+                self.show_image(event[1])
+            else:
+                break
 
-        warped = warp_image(img, contour)
-        warped_gray = cv2.cvtColor(warped, cv2.COLOR_BGR2GRAY)
-        cells = split_cells(warped_gray)
-        puzzle = extract_digits(cells)
-        original = [row[:] for row in puzzle]
+        self.cancel_event = None
+        self.upload_btn.config(state="normal")
+        if self.progress_frame is not None:
+            self.progress_frame.destroy()
+            self.progress_frame = None
+        if kind == "done":
+            self.finish_upload(*event[1:])
+        elif kind == "failed":
+            messagebox.showerror("Error", event[1])
 
-        if solve(puzzle):
-            solved_img = draw_solution(warped.copy(), puzzle, original)
+    def finish_upload(self, outcome, solved_img):
+        if outcome.status == "solved":
             self.show_image(solved_img)
             if hasattr(self, 'solved_label') and self.solved_label.winfo_exists():
                 self.solved_label.destroy()
@@ -185,6 +320,8 @@ class SudokuApp:
             def on_leave(e): self.save_btn.config(bg="#5a7bc0")
             self.save_btn.bind("<Enter>", on_enter)
             self.save_btn.bind("<Leave>", on_leave)
+        elif outcome.status == "gave_up":
+            messagebox.showerror("Error", "Gave up solving the puzzle. Some digits may have been misread.")
         else:
             messagebox.showerror("Error", "Could not solve the puzzle.")
 
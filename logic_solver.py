@@ -0,0 +1,250 @@
+from collections import namedtuple
+from itertools import combinations
+
+ALL_DIGITS = 0x1FF
+
+ROWS = [[r * 9 + c for c in range(9)] for r in range(9)]
+COLS = [[r * 9 + c for r in range(9)] for c in range(9)]
+BOXES = [[(b // 3) * 27 + (b % 3) * 3 + (k // 3) * 9 + k % 3 for k in range(9)] for b in range(9)]
+UNITS = ROWS + COLS + BOXES
+BOX_OF = [(i // 27) * 3 + (i % 9) // 3 for i in range(81)]
+PEERS = [sorted({p for unit in UNITS if i in unit for p in unit} - {i}) for i in range(81)]
+
+# Ordered easiest first; a technique's index is its rank.
+TECHNIQUES = [
+    "hidden_single",
+    "naked_single",
+    "pointing",
+    "claiming",
+    "naked_pair",
+    "hidden_pair",
+    "naked_triple",
+    "hidden_triple",
+    "x_wing",
+    "swordfish",
+]
+# Level -> highest rank it covers. Calibrated on generate_unique_puzzle output
+# at 22-36 clues: hidden singles only, naked singles, any other technique,
+# and puzzles logic cannot finish each make up a sizeable share.
+LEVELS = [("Easy", 0), ("Medium", 1), ("Hard", len(TECHNIQUES) - 1), ("Extreme", len(TECHNIQUES))]
+
+Step = namedtuple("Step", ["technique", "placements", "eliminations"])
+Grade = namedtuple("Grade", ["level", "rank", "hardest", "steps", "solved"])
+
+
+def _bits(mask):
+    return [d for d in range(9) if mask >> d & 1]
+
+
+def _popcount(mask):
+    return bin(mask).count("1")
+
+
+class LogicSolver:
+    """Solves a board with human-style deductions, one Step at a time.
+
+    Candidates are kept per cell as 9-bit masks so eliminations from earlier
+    steps carry forward. ``hardest`` is the rank of the hardest technique
+    used so far, or -1 if none has been needed yet.
+    """
+
+    def __init__(self, board):
+        self.values = [board[i // 9][i % 9] for i in range(81)]
+        self.cands = [0] * 81
+        self.hardest = -1
+        for i in range(81):
+            if not self.values[i]:
+                used = 0
+                for p in PEERS[i]:
+                    if self.values[p]:
+                        used |= 1 << (self.values[p] - 1)
+                self.cands[i] = ~used & ALL_DIGITS
+
+    def is_solved(self):
+        return 0 not in self.values
+
+    def is_broken(self):
+        return any(not self.values[i] and not self.cands[i] for i in range(81))
+
+    def next_step(self):
+        """Return the next deduction using the easiest technique that applies, or None when stuck."""
+        if self.is_broken():
+            return None
+        for finder in (self._hidden_single, self._naked_single, self._pointing, self._claiming,
+                       lambda: self._naked_subset(2), lambda: self._hidden_subset(2),
+                       lambda: self._naked_subset(3), lambda: self._hidden_subset(3),
+                       lambda: self._fish(2), lambda: self._fish(3)):
+            step = finder()
+            if step is not None:
+                return step
+        return None
+
+    def apply(self, step):
+        for row, col, num in step.placements:
+            i = row * 9 + col
+            bit = 1 << (num - 1)
+            self.values[i] = num
+            self.cands[i] = 0
+            for p in PEERS[i]:
+                self.cands[p] &= ~bit
+        for row, col, num in step.eliminations:
+            self.cands[row * 9 + col] &= ~(1 << (num - 1))
+        self.hardest = max(self.hardest, TECHNIQUES.index(step.technique))
+
+    def solve(self):
+        """Apply steps until solved or stuck; return the list of steps taken."""
+        steps = []
+        while not self.is_solved():
+            step = self.next_step()
+            if step is None:
+                break
+            self.apply(step)
+            steps.append(step)
+        return steps
+
+    def board(self):
+        return [self.values[r * 9:r * 9 + 9] for r in range(9)]
+
+    def _step(self, technique, placements=(), eliminations=()):
+        return Step(technique,
+                    [(i // 9, i % 9, d + 1) for i, d in placements],
+                    [(i // 9, i % 9, d + 1) for i, d in eliminations])
+
+    def _naked_single(self):
+        for i in range(81):
+            mask = self.cands[i]
+            if mask and not mask & (mask - 1):
+                return self._step("naked_single", [(i, _bits(mask)[0])])
+        return None
+
+    def _hidden_single(self):
+        for unit in UNITS:
+            for d in range(9):
+                places = [i for i in unit if self.cands[i] >> d & 1]
+                if len(places) == 1:
+                    return self._step("hidden_single", [(places[0], d)])
+        return None
+
+    def _pointing(self):
+        for box in BOXES:
+            for d in range(9):
+                places = [i for i in box if self.cands[i] >> d & 1]
+                if len(places) < 2:
+                    continue
+                for lines, line_of in ((ROWS, lambda i: i // 9), (COLS, lambda i: i % 9)):
+                    if len({line_of(i) for i in places}) == 1:
+                        line = lines[line_of(places[0])]
+                        elim = [(i, d) for i in line if i not in box and self.cands[i] >> d & 1]
+                        if elim:
+                            return self._step("pointing", eliminations=elim)
+        return None
+
+    def _claiming(self):
+        for line in ROWS + COLS:
+            for d in range(9):
+                places = [i for i in line if self.cands[i] >> d & 1]
+                if len(places) < 2 or len({BOX_OF[i] for i in places}) != 1:
+                    continue
+                elim = [(i, d) for i in BOXES[BOX_OF[places[0]]]
+                        if i not in line and self.cands[i] >> d & 1]
+                if elim:
+                    return self._step("claiming", eliminations=elim)
+        return None
+
+    def _naked_subset(self, n):
+        technique = "naked_pair" if n == 2 else "naked_triple"
+        for unit in UNITS:
+            empty = [i for i in unit if self.cands[i] and _popcount(self.cands[i]) <= n]
+            for group in combinations(empty, n):
+                mask = 0
+                for i in group:
+                    mask |= self.cands[i]
+                if _popcount(mask) != n:
+                    continue
+                elim = [(i, d) for i in unit if i not in group and self.cands[i] & mask
+                        for d in _bits(self.cands[i] & mask)]
+                if elim:
+                    return self._step(technique, eliminations=elim)
+        return None
+
+    def _hidden_subset(self, n):
+        technique = "hidden_pair" if n == 2 else "hidden_triple"
+        for unit in UNITS:
+            where = {}
+            for d in range(9):
+                places = frozenset(i for i in unit if self.cands[i] >> d & 1)
+                if 2 <= len(places) <= n:
+                    where[d] = places
+            for digits in combinations(sorted(where), n):
+                cells = frozenset().union(*(where[d] for d in digits))
+                if len(cells) != n:
+                    continue
+                keep = 0
+                for d in digits:
+                    keep |= 1 << d
+                elim = [(i, d) for i in sorted(cells) for d in _bits(self.cands[i] & ~keep)]
+                if elim:
+                    return self._step(technique, eliminations=elim)
+        return None
+
+    def _fish(self, n):
+        technique = "x_wing" if n == 2 else "swordfish"
+        for d in range(9):
+            for base, cover, cover_of in ((ROWS, COLS, lambda i: i % 9), (COLS, ROWS, lambda i: i // 9)):
+                lines = []
+                for k, line in enumerate(base):
+                    spots = frozenset(cover_of(i) for i in line if self.cands[i] >> d & 1)
+                    if 2 <= len(spots) <= n:
+                        lines.append((k, spots))
+                for group in combinations(lines, n):
+                    spots = frozenset().union(*(s for _, s in group))
+                    if len(spots) != n:
+                        continue
+                    rows = {k for k, _ in group}
+                    elim = [(i, d) for c in sorted(spots) for i in cover[c]
+                            if (i // 9 if base is ROWS else i % 9) not in rows and self.cands[i] >> d & 1]
+                    if elim:
+                        return self._step(technique, eliminations=elim)
+        return None
+
+
+def next_hint(board):
+    """Return the next placement Step reachable by logic from ``board``, or None if stuck.
+
+    Elimination-only steps are applied silently until a digit can be placed;
+    the returned step's technique is the one that produced the placement.
+    """
+    solver = LogicSolver(board)
+    while not solver.is_solved():
+        step = solver.next_step()
+        if step is None:
+            return None
+        if step.placements:
+            return step
+        solver.apply(step)
+    return None
+
+
+def level_of(rank):
+    """Name of the LEVELS entry covering difficulty ``rank``."""
+    return next(name for name, limit in LEVELS if rank <= limit)
+
+
+def grade(board):
+    """Grade ``board`` by the hardest technique needed to solve it by logic alone.
+
+    ``rank`` is the hardest technique's index in TECHNIQUES; puzzles that logic
+    cannot finish get rank len(TECHNIQUES), level Extreme and ``solved`` False.
+    """
+    solver = LogicSolver(board)
+    steps = solver.solve()
+    solved = solver.is_solved()
+    rank = solver.hardest if solved else len(TECHNIQUES)
+    level = level_of(rank)
+    hardest = TECHNIQUES[solver.hardest] if solver.hardest >= 0 else None
+    return Grade(level, rank, hardest, steps, solved)
+
+
+def difficulty_rank(board):
+    """Hardest technique rank needed, or len(TECHNIQUES) when logic gets stuck."""
+    return grade(board).rank
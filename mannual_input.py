@@ -1,10 +1,34 @@
+import queue
+import threading
+import time
 import tkinter as tk
-from solver import solve_board, generate_random_puzzle, solve_step
+import tkinter.filedialog as filedialog
+import tkinter.messagebox as messagebox
+from solver import SolveStats, solve_iterative, solve_portfolio, generate_random_puzzle, default_cache
+from solve_trace import SolveTrace, record_trace
+from grid_render import GridRenderer
+from canvas_board import DEFAULT_BOARD, CanvasBoard
+
+SOLVE_TIMEOUT = 5.0
+# Node budget for the in-process attempt; only puzzles that exceed it pay for
+# starting the multi-process portfolio.
+QUICK_NODES = 2000
+# The visualizer applies solver steps for at most FRAME_BUDGET seconds, then
+# renders once and yields to Tk for FRAME_MS before the next frame.
+FRAME_MS = 16
+FRAME_BUDGET = 0.010
+VISUAL_SPEEDS = [1, 2, 4, None]  # None means as fast as frames allow
+# Solving runs on a worker thread; the Tk loop polls it for progress and the result.
+PROGRESS_MS = 100
+# Node cap for recording the visualizer trace, which also runs on the worker.
+TRACE_NODES = 20000
+SPINNER = "◐◓◑◒"
 
 class SudokuGUI:
-    def __init__(self, root):
+    def __init__(self, root, board=DEFAULT_BOARD):
         self.root = root
         def close_on_esc(event=None):
+            self.cancel_solve()
             self.root.destroy()
         self.root.bind('<Escape>', close_on_esc)
         self.root = root
@@ -16,7 +40,10 @@ class SudokuGUI:
         
         self.original_values = None
         self.givens = [[False for _ in range(9)] for _ in range(9)]
-        self.step_iter = None
+        self.trace = None
+        self.trace_pos = 0
+        self.trace_scale = None
+        self.visual_board = None
         self.is_playing = False
         self.speed_multiplier = 1
         self.base_delay_ms = 300
@@ -24,6 +51,9 @@ class SudokuGUI:
         self.visual_controls_frame = None
         self.play_pause_btn = None
         self.speed_btns = {}
+        self.solve_thread = None
+        self._solve_job = None
+        self.solved_trace = None
 
         title = tk.Label(root, text="Sudoku Solver", font=("Helvetica", 20, "bold"))
         title.pack(pady=10)
@@ -34,27 +64,33 @@ class SudokuGUI:
         self.grid_frame = tk.Frame(main_frame, bg="black")
         self.grid_frame.grid(row=0, column=0, sticky="n")
 
-        for i in range(9):
-            for j in range(9):
-                entry = tk.Entry(self.grid_frame, width=2, font=("Helvetica", 22), justify='center', highlightthickness=0, relief="flat")
-                entry.configure(insertontime=0)
+        if board == "canvas":
+            self.board_canvas = CanvasBoard(self.grid_frame, on_select=self.select_cell, on_key=self.on_canvas_key)
+            self.board_canvas.pack()
+            self.cells = self.board_canvas.cells
+        else:
+            for i in range(9):
+                for j in range(9):
+                    entry = tk.Entry(self.grid_frame, width=2, font=("Helvetica", 22), justify='center', highlightthickness=0, relief="flat")
+                    entry.configure(insertontime=0)
 
-                top = 2 if i % 3 == 0 else 1
-                left = 2 if j % 3 == 0 else 1
-                bottom = 2 if i == 8 else 0
-                right = 2 if j == 8 else 0
+                    top = 2 if i % 3 == 0 else 1
+                    left = 2 if j % 3 == 0 else 1
+                    bottom = 2 if i == 8 else 0
+                    right = 2 if j == 8 else 0
 
-                entry.grid(row=i, column=j, ipadx=10, ipady=10, padx=(left, right), pady=(top, bottom))
+                    entry.grid(row=i, column=j, ipadx=10, ipady=10, padx=(left, right), pady=(top, bottom))
 
-                entry.bind("<FocusIn>", lambda e, row=i, col=j: self.select_cell(row, col))
-                entry.bind("<KeyPress>", lambda e: self.validate_input(e))
-                entry.bind("<KeyRelease>", lambda e, row=i, col=j: self.limit_input(row, col))
-                entry.bind("<Up>", lambda e, row=i, col=j: self.move_cursor(row-1, col))
-                entry.bind("<Down>", lambda e, row=i, col=j: self.move_cursor(row+1, col))
-                entry.bind("<Left>", lambda e, row=i, col=j: self.move_cursor(row, col-1))
-                entry.bind("<Right>", lambda e, row=i, col=j: self.move_cursor(row, col+1))
+                    entry.bind("<FocusIn>", lambda e, row=i, col=j: self.select_cell(row, col))
+                    entry.bind("<KeyPress>", lambda e: self.validate_input(e))
+                    entry.bind("<KeyRelease>", lambda e, row=i, col=j: self.limit_input(row, col))
+                    entry.bind("<Up>", lambda e, row=i, col=j: self.move_cursor(row-1, col))
+                    entry.bind("<Down>", lambda e, row=i, col=j: self.move_cursor(row+1, col))
+                    entry.bind("<Left>", lambda e, row=i, col=j: self.move_cursor(row, col-1))
+                    entry.bind("<Right>", lambda e, row=i, col=j: self.move_cursor(row, col+1))
 
-                self.cells[i][j] = entry
+                    self.cells[i][j] = entry
+        self.renderer = GridRenderer(self.cells)
 
         self.right_frame = tk.Frame(main_frame)
         self.right_frame.grid(row=0, column=1, padx=(30, 10), sticky="n")
@@ -74,6 +110,7 @@ class SudokuGUI:
         self.create_icon_button(control_frame, "⟲", self.reset_grid).grid(row=0, column=0, padx=5)
         self.create_icon_button(control_frame, "⌫", self.erase_cell).grid(row=0, column=1, padx=5)
         self.create_icon_button(control_frame, "🎲", self.fill_random).grid(row=0, column=2, padx=5)
+        self.create_icon_button(control_frame, "📂", self.load_trace).grid(row=0, column=3, padx=5)
 
         numbers_frame = tk.Frame(self.right_frame)
         numbers_frame.pack()
@@ -87,6 +124,13 @@ class SudokuGUI:
             )
             btn.grid(row=row, column=col, padx=5, pady=5)
 
+        status_frame = tk.Frame(self.right_frame)
+        status_frame.pack(pady=(10, 0))
+        self.solve_status = tk.Label(status_frame, text="", font=("Helvetica", 12, "bold"), fg="#7a8794")
+        self.solve_status.pack(side="left")
+        self.cancel_btn = self.create_custom_button(status_frame, text="Cancel", width=6, height=1,
+                                                    command=self.cancel_solve)
+
         self.solve_btn = self.create_custom_button(
             self.right_frame, text="Solve", width=14, height=2,
             bg="#5a7bc0", fg="white", hover_bg="#4b69ad",
@@ -151,6 +195,8 @@ class SudokuGUI:
         self.reset_focus()
 
     def solve(self):
+        if self.solve_thread is not None:
+            return
         self.original_values = [[self.cells[i][j].get() for j in range(9)] for i in range(9)]
         board = []
         for i in range(9):
@@ -161,8 +207,72 @@ class SudokuGUI:
             board.append(row)
 
         self.solved_cells.clear()
-
-        if solve_board(board):
+        self.solved_trace = None
+        self.solve_phase = None
+        self.solve_cancel = threading.Event()
+        self.solve_stats = SolveStats()
+        self.solve_results = queue.Queue()
+        self.solve_started = time.monotonic()
+        self.solve_thread = threading.Thread(target=self.solve_worker, daemon=True,
+                                             args=(board, self.solve_stats, self.solve_cancel, self.solve_results))
+        self.solve_thread.start()
+        if getattr(self, 'solve_btn', None):
+            self.solve_btn.config(state="disabled")
+        self.cancel_btn.pack(side="left", padx=(10, 0))
+        self.poll_solve()
+
+    def solve_worker(self, board, stats, cancel, results):
+        """Runs on a background thread; only touches the queue, never Tk.
+
+        Posts ("phase", label) as it moves between stages and finally
+        ("done", board, outcome, trace).
+        """
+        puzzle = [row[:] for row in board]
+        outcome = solve_iterative(board, max_nodes=QUICK_NODES, cancel=cancel, cache=default_cache, stats=stats)
+        if outcome.status == "gave_up" and outcome.reason == "max_nodes":
+            results.put(("phase", "racing strategies"))
+            outcome = solve_portfolio(board, timeout=SOLVE_TIMEOUT, cancel=cancel, stats=stats)
+        trace = None
+        if outcome.status == "solved":
+            results.put(("phase", "recording steps"))
+            trace = record_trace(puzzle, max_nodes=TRACE_NODES, cancel=cancel)
+        results.put(("done", board, outcome, trace))
+
+    def poll_solve(self):
+        while True:
+            try:
+                event = self.solve_results.get_nowait()
+            except queue.Empty:
+                elapsed = time.monotonic() - self.solve_started
+                spinner = SPINNER[int(elapsed * 1000 / PROGRESS_MS) % len(SPINNER)]
+                text = f"{spinner} {self.solve_stats.nodes:,} nodes  {elapsed:.1f}s"
+                if self.solve_phase:
+                    text += f"\n{self.solve_phase}"
+                self.solve_status.config(text="Cancelling…" if self.solve_cancel.is_set() else text)
+                self._solve_job = self.root.after(PROGRESS_MS, self.poll_solve)
+                return
+            if event[0] == "done":
+                break
+            self.solve_phase = event[1]
+        _, board, outcome, trace = event
+        self._solve_job = None
+        self.solve_thread = None
+        self.cancel_btn.pack_forget()
+        if getattr(self, 'solve_btn', None):
+            self.solve_btn.config(state="normal")
+        self.finish_solve(board, outcome, trace)
+
+    def cancel_solve(self):
+        if self.solve_thread is not None:
+            self.solve_cancel.set()
+
+    def finish_solve(self, board, outcome, trace=None):
+        current = [[self.cells[i][j].get() for j in range(9)] for i in range(9)]
+        if current != self.original_values:
+            self.solve_status.config(text="Grid changed while solving.")
+        elif outcome.status == "solved":
+            self.solve_status.config(text="")
+            self.solved_trace = trace
             for i in range(9):
                 for j in range(9):
                     self.cells[i][j].delete(0, tk.END)
@@ -171,8 +281,12 @@ class SudokuGUI:
                         self.solved_cells.add((i, j))
             self.reset_focus()
             self.replace_solve_with_visual_button()
+        elif outcome.reason == "cancelled":
+            self.solve_status.config(text="Cancelled.")
+        elif outcome.status == "gave_up":
+            self.solve_status.config(text=f"Gave up solving ({outcome.reason}).")
         else:
-            print("No solution exists.")
+            self.solve_status.config(text="No solution exists.")
 
     def replace_solve_with_visual_button(self):
         if getattr(self, 'solve_btn', None):
@@ -190,29 +304,32 @@ class SudokuGUI:
         self.show_backtrack_btn.pack(pady=(10, 0))
 
     def show_backtracking(self):
-        if self.original_values is None:
-            self.original_values = [[self.cells[i][j].get() for j in range(9)] for i in range(9)]
-
+        if self.solved_trace is not None:
+            self.start_visualization(self.solved_trace)
+
+    def start_visualization(self, trace):
+        """Show ``trace`` from its first event with playback, scrub and save controls."""
+        self.cancel_next_step()
+        self.trace = trace
+        self.trace_pos = 0
+        if trace.truncated:
+            self.solve_status.config(text=f"Trace cut short after {len(trace):,} steps.")
+        self.visual_board = trace.start_board()
         for i in range(9):
             for j in range(9):
+                val = self.visual_board[i][j]
                 self.cells[i][j].delete(0, tk.END)
-                val = self.original_values[i][j]
-                if val.isdigit() and val != '0':
-                    self.cells[i][j].insert(0, val)
-                    self.givens[i][j] = True
-                else:
-                    self.givens[i][j] = False
-
-        board = [[int(v) if (isinstance(v, str) and v.isdigit()) else (v if isinstance(v, int) else 0)
-                  for v in row] for row in self.original_values]
-        self.step_iter = solve_step(board)
-
-        if getattr(self, 'show_backtrack_btn', None):
-            try:
-                self.show_backtrack_btn.destroy()
-            except Exception:
-                pass
-            self.show_backtrack_btn = None
+                if val:
+                    self.cells[i][j].insert(0, str(val))
+                self.givens[i][j] = val != 0
+
+        for name in ('solve_btn', 'show_backtrack_btn'):
+            if getattr(self, name, None):
+                try:
+                    getattr(self, name).destroy()
+                except Exception:
+                    pass
+                setattr(self, name, None)
 
         if self.visual_controls_frame is None:
             self.visual_controls_frame = tk.Frame(self.right_frame)
@@ -232,15 +349,24 @@ class SudokuGUI:
         self.play_pause_btn.grid(row=0, column=0, padx=5)
 
         self.speed_btns.clear()
-        speeds = [1, 2, 4]
-        for idx, sp in enumerate(speeds, start=1):
+        for idx, sp in enumerate(VISUAL_SPEEDS, start=1):
             btn = self.create_custom_button(
-                self.visual_controls_frame, text=f"{sp}x",
+                self.visual_controls_frame, text=f"{sp}x" if sp else "Max",
                 command=lambda s=sp: self.set_speed(s), width=3, height=1
             )
             btn.grid(row=0, column=idx, padx=5)
             self.speed_btns[sp] = btn
 
+        for idx, (icon, command) in enumerate([("◀", lambda: self.step_trace(-1)),
+                                               ("▶", lambda: self.step_trace(1)),
+                                               ("💾", self.save_trace)]):
+            self.create_custom_button(self.visual_controls_frame, text=icon, command=command,
+                                      width=3, height=1).grid(row=1, column=idx, padx=5, pady=(5, 0))
+
+        self.trace_scale = tk.Scale(self.visual_controls_frame, from_=0, to=len(trace), orient="horizontal",
+                                    showvalue=False, highlightthickness=0, command=self.seek_trace)
+        self.trace_scale.grid(row=2, column=0, columnspan=len(VISUAL_SPEEDS) + 1, sticky="ew", pady=(10, 0))
+
         self.is_playing = True
         if self.play_pause_btn:
             self.play_pause_btn.config(text="⏸")
@@ -250,45 +376,127 @@ class SudokuGUI:
         self.is_playing = not self.is_playing
         if self.play_pause_btn:
             self.play_pause_btn.config(text="⏸" if self.is_playing else "⏵")
+        self.cancel_next_step()
         if self.is_playing:
+            if self.trace is not None and self.trace_pos >= len(self.trace):
+                self.show_trace_position(0)
             self.run_next_step()
 
     def set_speed(self, multiplier):
         self.speed_multiplier = multiplier
 
     def run_next_step(self):
-        if not self.is_playing or self.step_iter is None:
+        self._after_job = None
+        if not self.is_playing or self.trace is None:
             return
-        try:
-            step = next(self.step_iter)
-            action, r, c, num = step
-            self.selected_cell = (r, c)
-            self.highlight_conflicts()
-            if not self.givens[r][c]:
-                if action == "place":
-                    self.cells[r][c].delete(0, tk.END)
-                    self.cells[r][c].insert(0, str(num))
-                elif action == "remove":
-                    self.cells[r][c].delete(0, tk.END)
-            self.highlight_conflicts()
-        except StopIteration:
+        if self.speed_multiplier is None:
+            self.show_trace_position(len(self.trace), time.perf_counter() + FRAME_BUDGET)
+            delay = FRAME_MS
+        else:
+            self.show_trace_position(self.trace_pos + 1)
+            delay = int(self.base_delay_ms / max(1, self.speed_multiplier))
+
+        if self.trace_pos >= len(self.trace):
             self.is_playing = False
             if self.play_pause_btn:
                 self.play_pause_btn.config(text="⏵")
             return
-
-        delay = int(self.base_delay_ms / max(1, self.speed_multiplier))
         self._after_job = self.root.after(delay, self.run_next_step)
 
-    def stop_visualization(self, restore_solve=False):
+    def cancel_next_step(self):
         if self._after_job is not None:
             try:
                 self.root.after_cancel(self._after_job)
             except Exception:
                 pass
             self._after_job = None
+
+    def show_trace_position(self, target, deadline=None):
+        """Move the visualization toward ``target`` events into the trace and render once.
+
+        Short moves apply or undo events one by one, stopping early once
+        ``deadline`` passes; longer jumps rebuild from the nearest checkpoint.
+        """
+        trace = self.trace
+        target = max(0, min(target, len(trace)))
+        dirty = set()
+        if deadline is None and abs(target - self.trace_pos) > trace.interval:
+            board = trace.board_at(target)
+            for r in range(9):
+                for c in range(9):
+                    if board[r][c] != self.visual_board[r][c]:
+                        self.visual_board[r][c] = board[r][c]
+                        dirty.add((r, c))
+            self.trace_pos = target
+        while self.trace_pos < target:
+            action, r, c, num = trace.event(self.trace_pos)
+            self.visual_board[r][c] = num if action == "place" else 0
+            dirty.add((r, c))
+            self.trace_pos += 1
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+        while self.trace_pos > target:
+            self.trace_pos -= 1
+            action, r, c, num = trace.event(self.trace_pos)
+            self.visual_board[r][c] = 0 if action == "place" else num
+            dirty.add((r, c))
+
+        self.selected_cell = trace.event(self.trace_pos - 1)[1:3] if self.trace_pos else None
+        self.render_visual_cells(dirty)
+        if self.trace_scale is not None:
+            self.trace_scale.set(self.trace_pos)
+
+    def seek_trace(self, value):
+        position = int(float(value))
+        if self.trace is not None and position != self.trace_pos:
+            self.show_trace_position(position)
+
+    def step_trace(self, delta):
+        if self.trace is None:
+            return
+        if self.is_playing:
+            self.toggle_play_pause()
+        self.show_trace_position(self.trace_pos + delta)
+
+    def save_trace(self):
+        if self.trace is None:
+            return
+        path = filedialog.asksaveasfilename(parent=self.root, defaultextension=".trace",
+                                            filetypes=[("Solve traces", "*.trace")])
+        if not path:
+            return
+        try:
+            self.trace.save(path)
+        except OSError as e:
+            messagebox.showerror("Save trace", str(e), parent=self.root)
+
+    def load_trace(self):
+        path = filedialog.askopenfilename(parent=self.root, filetypes=[("Solve traces", "*.trace")])
+        if not path:
+            return
+        try:
+            trace = SolveTrace.load(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Load trace", str(e), parent=self.root)
+            return
+        self.solved_cells.clear()
+        self.original_values = [[str(v) if v else '' for v in row] for row in trace.start_board()]
+        self.start_visualization(trace)
+
+    def render_visual_cells(self, dirty):
+        """Write the final text of each cell changed this frame, then restyle once."""
+        for r, c in dirty:
+            val = self.visual_board[r][c]
+            self.cells[r][c].delete(0, tk.END)
+            if val:
+                self.cells[r][c].insert(0, str(val))
+        self.highlight_conflicts()
+
+    def stop_visualization(self, restore_solve=False):
+        self.cancel_next_step()
         self.is_playing = False
-        self.step_iter = None
+        self.trace = None
+        self.trace_scale = None
         self.selected_cell = None
         self.highlight_conflicts()
         if self.visual_controls_frame is not None:
@@ -335,6 +543,12 @@ class SudokuGUI:
         else:
             return "break"
 
+    def on_canvas_key(self, event):
+        if event.keysym in ("BackSpace", "Delete"):
+            self.erase_cell()
+            return "break"
+        return self.validate_input(event)
+
     def limit_input(self, row, col):
         value = self.cells[row][col].get()
         if len(value) > 1:
@@ -343,49 +557,39 @@ class SudokuGUI:
         self.highlight_conflicts()
 
     def highlight_conflicts(self):
-        for i in range(9):
-            for j in range(9):
-                if (i, j) in getattr(self, 'solved_cells', set()):
-                    self.cells[i][j].config(bg="white", fg="#5a7bc0")
-                else:
-                    self.cells[i][j].config(bg="white", fg="black")
-
+        values = [[self.cells[i][j].get() for j in range(9)] for i in range(9)]
+        row = col = None
         if self.selected_cell:
             row, col = self.selected_cell
 
-            for i in range(9):
-                self.cells[row][i].config(bg="#e0f0ff")
-                self.cells[i][col].config(bg="#e0f0ff")
-
-            start_row = (row // 3) * 3
-            start_col = (col // 3) * 3
-            for i in range(start_row, start_row + 3):
-                for j in range(start_col, start_col + 3):
-                    self.cells[i][j].config(bg="#e0f0ff")
-
-            self.cells[row][col].config(bg="#a5d8ff")
-            self.cells[row][col].focus_set()
-
+        styles = []
         for i in range(9):
+            style_row = []
             for j in range(9):
-                val = self.cells[i][j].get()
-                if val:
-                    for k in range(9):
-                        if k != j and self.cells[i][k].get() == val:
-                            self.cells[i][j].config(bg="#fddede", fg="red")
-                    for k in range(9):
-                        if k != i and self.cells[k][j].get() == val:
-                            self.cells[i][j].config(bg="#fddede", fg="red")
-                    box_row = (i // 3) * 3
-                    box_col = (j // 3) * 3
-                    for r in range(box_row, box_row + 3):
-                        for c in range(box_col, box_col + 3):
-                            if (r != i or c != j) and self.cells[r][c].get() == val:
-                                self.cells[i][j].config(bg="#fddede", fg="red")
+                bg = "white"
+                fg = "#5a7bc0" if (i, j) in self.solved_cells else "black"
+                if row is not None and (i == row or j == col or (i // 3 == row // 3 and j // 3 == col // 3)):
+                    bg = "#e0f0ff"
+                val = values[i][j]
+                if val and self.has_conflict(values, i, j):
+                    bg, fg = "#fddede", "red"
+                if (i, j) == self.selected_cell:
+                    bg = "#a5d8ff"
+                style_row.append(("normal", bg, fg))
+            styles.append(style_row)
+        self.renderer.render(styles)
 
         if self.selected_cell:
-            row, col = self.selected_cell
-            self.cells[row][col].config(bg="#a5d8ff")
+            self.cells[row][col].focus_set()
+
+    def has_conflict(self, values, i, j):
+        val = values[i][j]
+        box_row = (i // 3) * 3
+        box_col = (j // 3) * 3
+        return (any(k != j and values[i][k] == val for k in range(9))
+                or any(k != i and values[k][j] == val for k in range(9))
+                or any((r != i or c != j) and values[r][c] == val
+                       for r in range(box_row, box_row + 3) for c in range(box_col, box_col + 3)))
 
     def reset_focus(self):
         self.selected_cell = None
@@ -394,7 +598,7 @@ class SudokuGUI:
 
     def handle_root_click(self, event):
         widget = event.widget
-        if isinstance(widget, tk.Entry):
+        if isinstance(widget, (tk.Entry, CanvasBoard, tk.Scale)):
             return
         if isinstance(widget, tk.Button):
             if widget['text'] in [str(i) for i in range(1, 10)] + ["⌫"]:
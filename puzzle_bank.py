@@ -0,0 +1,197 @@
+import argparse
+import mmap
+import os
+import random
+import struct
+from collections import namedtuple
+
+from logic_solver import LEVELS, difficulty_rank, grade
+from solver import generate_unique_puzzle
+
+MAGIC = b"SDKB"
+VERSION = 1
+HEADER = struct.Struct("<4sBBH")
+TIER = struct.Struct("<16sII")
+DEFAULT_PATH = os.environ.get("SUDOKU_BANK", os.path.join(os.path.dirname(os.path.abspath(__file__)), "puzzles.bank"))
+# Logic grade level -> clues to dig down to when generating puzzles for it.
+DEFAULT_TIERS = [("Easy", 36), ("Medium", 28), ("Hard", 24), ("Extreme", 23)]
+
+BankEntry = namedtuple("BankEntry", ["puzzle", "solution", "rating"])
+
+
+def _pack(board, packed):
+    flat = [v for row in board for v in row]
+    if not packed:
+        return bytes(flat)
+    flat.append(0)
+    return bytes((flat[k] << 4) | flat[k + 1] for k in range(0, 82, 2))
+
+
+def _unpack(data, packed):
+    if packed:
+        flat = []
+        for byte in data:
+            flat.append(byte >> 4)
+            flat.append(byte & 0x0F)
+        flat.pop()
+    else:
+        flat = list(data)
+    return [flat[r * 9:r * 9 + 9] for r in range(9)]
+
+
+def write_bank(path, tiers, packed=True):
+    """Write a bank file from ``tiers``, a list of (name, records) pairs.
+
+    Records are (puzzle, solution, rating) tuples and are streamed straight to
+    disk, so each tier may be a generator of any length.
+    """
+    board_size = 41 if packed else 81
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, int(packed), len(tiers)))
+        index_at = f.tell()
+        f.write(b"\0" * TIER.size * len(tiers))
+
+        index = []
+        start = 0
+        for name, records in tiers:
+            count = 0
+            for puzzle, solution, rating in records:
+                f.write(_pack(puzzle, packed))
+                f.write(_pack(solution, packed))
+                f.write(bytes((min(255, rating),)))
+                count += 1
+            index.append(TIER.pack(name.encode("utf-8")[:16], start, count))
+            start += count
+
+        f.seek(index_at)
+        f.write(b"".join(index))
+    return start
+
+
+class PuzzleBank:
+    """Read-only, memory-mapped view of a bank file with constant-time random draws per tier."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, packed, tier_count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a puzzle bank")
+
+        self.packed = bool(packed)
+        self.board_size = 41 if self.packed else 81
+        self.record_size = self.board_size * 2 + 1
+        self.tiers = {}
+        offset = HEADER.size
+        for _ in range(tier_count):
+            name, start, count = TIER.unpack_from(self._map, offset)
+            self.tiers[name.rstrip(b"\0").decode("utf-8")] = (start, count)
+            offset += TIER.size
+        self._records_at = offset
+        self.size = sum(count for _, count in self.tiers.values())
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, tier):
+        return self.tiers.get(tier, (0, 0))[1] > 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, index):
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        at = self._records_at + index * self.record_size
+        record = self._map[at:at + self.record_size]
+        size = self.board_size
+        return BankEntry(_unpack(record[:size], self.packed),
+                         _unpack(record[size:2 * size], self.packed),
+                         record[-1])
+
+    def random(self, tier, rng=random):
+        start, count = self.tiers[tier]
+        if not count:
+            raise KeyError(tier)
+        return self.get(start + rng.randrange(count))
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def open_bank(path=DEFAULT_PATH):
+    """Return the PuzzleBank at ``path``, or None if no bank has been built there."""
+    if not os.path.exists(path):
+        return None
+    return PuzzleBank(path)
+
+
+def _generate(givens, count):
+    for _ in range(count):
+        generated = generate_unique_puzzle(givens)
+        yield generated.puzzle, generated.solution, difficulty_rank(generated.puzzle)
+
+
+def _generate_level(level, givens, count, max_tries):
+    """Yield up to ``count`` records generated at ``givens`` clues that grade as ``level``."""
+    found = 0
+    for _ in range(max_tries):
+        if found >= count:
+            break
+        generated = generate_unique_puzzle(givens)
+        graded = grade(generated.puzzle)
+        if graded.level == level:
+            found += 1
+            yield generated.puzzle, generated.solution, graded.rank
+
+
+def _generate_by_grade(givens, count, max_tries):
+    """Bucket generated puzzles by logic grade until every level has ``count`` (or tries run out)."""
+    buckets = {name: [] for name, _ in LEVELS}
+    for _ in range(max_tries):
+        if all(len(records) >= count for records in buckets.values()):
+            break
+        generated = generate_unique_puzzle(givens)
+        graded = grade(generated.puzzle)
+        if len(buckets[graded.level]) < count:
+            buckets[graded.level].append((generated.puzzle, generated.solution, graded.rank))
+    return [(name, buckets[name]) for name, _ in LEVELS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a memory-mapped Sudoku puzzle bank.")
+    parser.add_argument("path", nargs="?", default=DEFAULT_PATH)
+    parser.add_argument("--count", type=int, default=1000, help="puzzles per tier")
+    parser.add_argument("--tiers", nargs="+", default=[f"{name}:{given}" for name, given in DEFAULT_TIERS],
+                        help="tiers as LEVEL:GIVENS; only puzzles that grade as LEVEL are kept")
+    parser.add_argument("--ungraded", action="store_true",
+                        help="treat --tiers as NAME:GIVENS and keep every puzzle regardless of grade")
+    parser.add_argument("--unpacked", action="store_true", help="store one byte per cell instead of four bits")
+    parser.add_argument("--by-grade", type=int, metavar="GIVENS",
+                        help="generate puzzles with GIVENS clues and tier them by logic grade instead")
+    args = parser.parse_args()
+
+    if args.by_grade:
+        tiers = _generate_by_grade(args.by_grade, args.count, args.count * 50)
+    else:
+        levels = [name for name, _ in LEVELS]
+        tiers = []
+        for spec in args.tiers:
+            name, given = spec.split(":")
+            if args.ungraded:
+                tiers.append((name, _generate(int(given), args.count)))
+            elif name in levels:
+                tiers.append((name, _generate_level(name, int(given), args.count, args.count * 50)))
+            else:
+                parser.error(f"unknown level {name!r}; expected one of {', '.join(levels)} or --ungraded")
+    total = write_bank(args.path, tiers, packed=not args.unpacked)
+    print(f"Wrote {total} puzzles to {args.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import struct
+import sys
+from array import array
+
+from solver import BitBoard, SearchAborted, SolveStats, _COL, _ROW, _search
+
+MAGIC = b"SDKT"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHI")
+CHECKPOINT_INTERVAL = 256
+
+# Each event is one uint16: bit 11 set for "place", cell index in bits 4-10,
+# digit in bits 0-3.
+_PLACE = 1 << 11
+# Header flag bits; the truncation bits record why the recording stopped.
+_SOLVED = 1
+_TRUNCATED = 2
+_CANCELLED = 4
+_REASON_FLAGS = {"max_nodes": _TRUNCATED, "cancelled": _CANCELLED}
+
+
+class SolveTrace:
+    """A recorded backtracking solve: the start board plus packed place/remove events.
+
+    Iterating yields ("place"/"remove", row, col, num) tuples. A board
+    snapshot is kept every ``interval`` events so ``board_at`` replays at most
+    ``interval`` events from the nearest one. ``truncated`` is the reason the
+    recording stopped early ("max_nodes" or "cancelled"), or None.
+    """
+
+    def __init__(self, start, events, solved, interval=CHECKPOINT_INTERVAL, truncated=None):
+        self.start = bytes(start)
+        self.events = events
+        self.solved = solved
+        self.truncated = truncated
+        self.interval = interval
+        self.checkpoints = []
+        cells = bytearray(self.start)
+        for k, code in enumerate(events):
+            if k % interval == 0:
+                self.checkpoints.append(bytes(cells))
+            cells[code >> 4 & 0x7F] = code & 0x0F if code & _PLACE else 0
+
+    def __len__(self):
+        return len(self.events)
+
+    def __iter__(self):
+        for k in range(len(self.events)):
+            yield self.event(k)
+
+    def event(self, k):
+        code = self.events[k]
+        i = code >> 4 & 0x7F
+        return ("place" if code & _PLACE else "remove", _ROW[i], _COL[i], code & 0x0F)
+
+    def board_at(self, position):
+        """Return the 9x9 board after the first ``position`` events."""
+        position = max(0, min(position, len(self.events)))
+        k = position // self.interval
+        if k < len(self.checkpoints):
+            cells = bytearray(self.checkpoints[k])
+            first = k * self.interval
+        else:
+            cells = bytearray(self.checkpoints[-1]) if self.checkpoints else bytearray(self.start)
+            first = (len(self.checkpoints) - 1) * self.interval if self.checkpoints else 0
+        for code in self.events[first:position]:
+            cells[code >> 4 & 0x7F] = code & 0x0F if code & _PLACE else 0
+        return [list(cells[r * 9:r * 9 + 9]) for r in range(9)]
+
+    def start_board(self):
+        return self.board_at(0)
+
+    def save(self, path):
+        events = array("H", self.events)
+        if sys.byteorder == "big":
+            events.byteswap()
+        with open(path, "wb") as f:
+            flags = _SOLVED if self.solved else 0
+            if self.truncated:
+                flags |= _REASON_FLAGS.get(self.truncated, _TRUNCATED)
+            f.write(HEADER.pack(MAGIC, VERSION, flags, self.interval, len(events)))
+            f.write(self.start)
+            f.write(events.tobytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        try:
+            magic, version, flags, interval, count = HEADER.unpack_from(data, 0)
+        except struct.error:
+            raise ValueError(f"{path} is not a solve trace") from None
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a solve trace")
+        start = data[HEADER.size:HEADER.size + 81]
+        events = array("H")
+        events.frombytes(data[HEADER.size + 81:HEADER.size + 81 + 2 * count])
+        if sys.byteorder == "big":
+            events.byteswap()
+        if len(start) != 81 or len(events) != count:
+            raise ValueError(f"{path} is truncated")
+        if max(start) > 9 or any(code >> 12 or (code >> 4 & 0x7F) > 80 or not 1 <= code & 0x0F <= 9
+                                 for code in events):
+            raise ValueError(f"{path} has out-of-range cells")
+        truncated = None
+        if flags & _CANCELLED:
+            truncated = "cancelled"
+        elif flags & _TRUNCATED:
+            truncated = "max_nodes"
+        return cls(start, events, bool(flags & _SOLVED), interval or CHECKPOINT_INTERVAL, truncated)
+
+
+def record_trace(board, interval=CHECKPOINT_INTERVAL, max_nodes=None, cancel=None):
+    """Solve ``board`` with the bitmask search and return the SolveTrace of its moves.
+
+    Events come from the SolveStats place/remove hooks of ``_search`` run in
+    ascending digit order. When ``max_nodes`` or ``cancel`` stops the search,
+    the events so far are kept and ``truncated`` holds the reason.
+    """
+    bb = BitBoard(board)
+    start = bytes(bb.cells)
+    events = array("H")
+    stats = SolveStats(on_place=lambda r, c, num: events.append(_PLACE | (r * 9 + c) << 4 | num),
+                       on_remove=lambda r, c, num: events.append((r * 9 + c) << 4 | num))
+    solved = False
+    truncated = None
+    if bb.valid:
+        try:
+            solved = _search(bb, None, stats=stats, max_nodes=max_nodes, cancel=cancel)
+        except SearchAborted as e:
+            truncated = e.reason
+    return SolveTrace(start, events, solved, interval, truncated)
@@ -1,4 +1,13 @@
+import atexit
+import itertools
+import multiprocessing
+import os
+import queue
 import random
+import time
+from collections import OrderedDict, namedtuple
+
+from canonical import canonical_form, invert_transform
 
 def is_valid(board, row, col, num):
     for x in range(9):
@@ -25,49 +34,1007 @@ def find_empty(board):
                 return i, j
     return None
 
-def solve_board(board):
-    empty = find_empty(board)
-    if not empty:
+ALL_DIGITS = 0x1FF
+
+_ROW = [i // 9 for i in range(81)]
+_COL = [i % 9 for i in range(81)]
+_BOX = [(i // 27) * 3 + (i % 9) // 3 for i in range(81)]
+_UNITS = ([[r * 9 + c for c in range(9)] for r in range(9)] +
+          [[r * 9 + c for r in range(9)] for c in range(9)] +
+          [[(b // 3) * 27 + (b % 3) * 3 + (k // 3) * 9 + k % 3 for k in range(9)] for b in range(9)])
+_DIGITS = [tuple(d + 1 for d in range(9) if mask >> d & 1) for mask in range(512)]
+_COUNT = [len(digits) for digits in _DIGITS]
+
+
+class BitBoard:
+    """Flat 81-cell board with row/column/box digit bitmasks and an undo trail."""
+
+    def __init__(self, board):
+        self.cells = [board[i][j] for i in range(9) for j in range(9)]
+        self.rows = [0] * 9
+        self.cols = [0] * 9
+        self.boxes = [0] * 9
+        self.trail = []
+        self.valid = True
+        for i, num in enumerate(self.cells):
+            if num:
+                bit = 1 << (num - 1)
+                r, c, b = _ROW[i], _COL[i], _BOX[i]
+                if (self.rows[r] | self.cols[c] | self.boxes[b]) & bit:
+                    self.valid = False
+                self.rows[r] |= bit
+                self.cols[c] |= bit
+                self.boxes[b] |= bit
+
+    def candidates(self, i):
+        return ~(self.rows[_ROW[i]] | self.cols[_COL[i]] | self.boxes[_BOX[i]]) & ALL_DIGITS
+
+    def place(self, i, num):
+        bit = 1 << (num - 1)
+        self.cells[i] = num
+        self.rows[_ROW[i]] |= bit
+        self.cols[_COL[i]] |= bit
+        self.boxes[_BOX[i]] |= bit
+        self.trail.append(i)
+
+    def undo(self, mark):
+        cells, trail = self.cells, self.trail
+        while len(trail) > mark:
+            i = trail.pop()
+            bit = ~(1 << (cells[i] - 1))
+            cells[i] = 0
+            self.rows[_ROW[i]] &= bit
+            self.cols[_COL[i]] &= bit
+            self.boxes[_BOX[i]] &= bit
+
+    def propagate(self):
+        """Fill naked and hidden singles; return False on a contradiction."""
+        cells, rows, cols, boxes = self.cells, self.rows, self.cols, self.boxes
+        changed = True
+        while changed:
+            changed = False
+            for i in range(81):
+                if cells[i]:
+                    continue
+                cand = ~(rows[_ROW[i]] | cols[_COL[i]] | boxes[_BOX[i]]) & ALL_DIGITS
+                if not cand:
+                    return False
+                if not cand & (cand - 1):
+                    self.place(i, _DIGITS[cand][0])
+                    changed = True
+            if changed:
+                continue
+
+            for unit in _UNITS:
+                once = twice = placed = 0
+                for i in unit:
+                    num = cells[i]
+                    if num:
+                        placed |= 1 << (num - 1)
+                        continue
+                    cand = ~(rows[_ROW[i]] | cols[_COL[i]] | boxes[_BOX[i]]) & ALL_DIGITS
+                    twice |= once & cand
+                    once |= cand
+                if (once | placed) != ALL_DIGITS:
+                    return False
+                hidden = once & ~twice
+                if not hidden:
+                    continue
+                for i in unit:
+                    if cells[i]:
+                        continue
+                    cand = ~(rows[_ROW[i]] | cols[_COL[i]] | boxes[_BOX[i]]) & ALL_DIGITS
+                    only = cand & hidden
+                    if only:
+                        if only & (only - 1):
+                            return False
+                        self.place(i, _DIGITS[only][0])
+                        changed = True
         return True
 
-    row, col = empty
-    nums = list(range(1, 10))
-    random.shuffle(nums)
+    def most_constrained(self):
+        """Return the empty cell with the fewest candidates, or None if full."""
+        cells, rows, cols, boxes = self.cells, self.rows, self.cols, self.boxes
+        best, best_count = None, 10
+        for i in range(81):
+            if cells[i]:
+                continue
+            count = _COUNT[~(rows[_ROW[i]] | cols[_COL[i]] | boxes[_BOX[i]]) & ALL_DIGITS]
+            if count < best_count:
+                best, best_count = i, count
+                if count <= 2:
+                    break
+        return best
 
-    for num in nums:
-        if is_valid(board, row, col, num):
-            board[row][col] = num
-            if solve_board(board):
+    def to_board(self, board):
+        for i in range(81):
+            board[_ROW[i]][_COL[i]] = self.cells[i]
+
+
+class SearchAborted(Exception):
+    """Raised when a search gives up before finishing; ``reason`` says why."""
+
+    def __init__(self, reason):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class SolveTimeout(SearchAborted):
+    def __init__(self, reason="deadline"):
+        super().__init__(reason)
+
+
+def _check_budget(nodes, deadline, max_nodes, cancel):
+    if max_nodes is not None and nodes > max_nodes:
+        raise SearchAborted("max_nodes")
+    if deadline is not None and time.monotonic() > deadline:
+        raise SolveTimeout()
+    if cancel is not None and cancel.is_set():
+        raise SearchAborted("cancelled")
+
+
+class SolveStats:
+    """Search counters filled in by any solver entry point given ``stats=``.
+
+    ``on_place(row, col, num)`` and ``on_remove(row, col, num)`` are called for
+    every placement and removal the search makes, including propagated cells.
+    Solvers only touch the stats object when one is passed, so leaving it out
+    costs a single ``is None`` check per node.
+    """
+
+    FIELDS = ("nodes", "guesses", "backtracks", "propagations", "max_depth", "restarts", "wall_time")
+
+    def __init__(self, on_place=None, on_remove=None):
+        self.nodes = 0
+        self.guesses = 0
+        self.backtracks = 0
+        self.propagations = 0
+        self.max_depth = 0
+        self.restarts = 0
+        self.wall_time = 0.0
+        self.on_place = on_place
+        self.on_remove = on_remove
+
+    def enter(self, depth):
+        self.nodes += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def placed(self, row, col, num):
+        if self.on_place is not None:
+            self.on_place(row, col, num)
+
+    def removed(self, row, col, num):
+        if self.on_remove is not None:
+            self.on_remove(row, col, num)
+
+    def placed_trail(self, bb, mark):
+        if self.on_place is not None:
+            for i in bb.trail[mark:]:
+                self.on_place(_ROW[i], _COL[i], bb.cells[i])
+
+    def removing_trail(self, bb, mark):
+        if self.on_remove is not None:
+            for i in reversed(bb.trail[mark:]):
+                self.on_remove(_ROW[i], _COL[i], bb.cells[i])
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def __getstate__(self):
+        return self.as_dict()
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.__dict__.update(state)
+
+    def __repr__(self):
+        return "SolveStats(" + ", ".join(f"{k}={v!r}" for k, v in self.as_dict().items()) + ")"
+
+
+def _search(bb, rng, deadline=None, stats=None, max_nodes=None, cancel=None):
+    """Depth-first search with an explicit stack of branch frames.
+
+    ``rng`` shuffles the digit order at each branch (the random module or a
+    random.Random); pass None for ascending order.
+
+    Each frame is [mark, inner, cell, nums, next]: the trail length before and
+    after propagation at that node, the branching cell, its candidate digits
+    and the index of the next one to try. Budgets are checked once per node.
+    """
+    budgeted = deadline is not None or max_nodes is not None or cancel is not None
+    stack = []
+    nodes = 0
+    while True:
+        nodes += 1
+        if budgeted:
+            _check_budget(nodes, deadline, max_nodes, cancel)
+        mark = len(bb.trail)
+        ok = bb.propagate()
+        if stats is not None:
+            stats.enter(len(stack))
+            stats.propagations += len(bb.trail) - mark
+            stats.placed_trail(bb, mark)
+        if ok:
+            i = bb.most_constrained()
+            if i is None:
                 return True
-            board[row][col] = 0
+            nums = list(_DIGITS[bb.candidates(i)])
+            if rng is not None:
+                rng.shuffle(nums)
+            stack.append([mark, len(bb.trail), i, nums, 0])
+        else:
+            if stats is not None:
+                stats.removing_trail(bb, mark)
+            bb.undo(mark)
+
+        while stack:
+            frame = stack[-1]
+            mark, inner, i, nums, k = frame
+            if k:
+                if stats is not None:
+                    stats.backtracks += 1
+                    stats.removing_trail(bb, inner)
+                bb.undo(inner)
+            if k < len(nums):
+                frame[4] = k + 1
+                bb.place(i, nums[k])
+                if stats is not None:
+                    stats.guesses += len(nums) > 1
+                    stats.placed_trail(bb, inner)
+                break
+            if stats is not None:
+                stats.removing_trail(bb, mark)
+            bb.undo(mark)
+            stack.pop()
+        else:
+            return False
 
-    return False
 
+def solve_board_bitmask(board, deadline=None, stats=None, max_nodes=None, cancel=None, rng=random):
+    start = time.perf_counter()
+    try:
+        bb = BitBoard(board)
+        if not bb.valid or not _search(bb, rng, deadline, stats, max_nodes, cancel):
+            return False
+        bb.to_board(board)
+        return True
+    finally:
+        if stats is not None:
+            stats.wall_time += time.perf_counter() - start
 
-def solve_step(board):
-    def backtrack():
-        empty = find_empty(board)
-        if not empty:
-            return True
 
-        row, col = empty
-        for num in range(1, 10):
-            if is_valid(board, row, col, num):
-                board[row][col] = num
-                yield ("place", row, col, num)
+def luby(i):
+    """Return the i-th (1-based) term of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, ..."""
+    while True:
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+        if i == (1 << k) - 1:
+            return 1 << (k - 1)
+        i -= (1 << (k - 1)) - 1
 
-                result = yield from backtrack()
-                if result:
-                    return True
 
-                board[row][col] = 0
-                yield ("remove", row, col, num)
+def solve_with_restarts(board, seed=None, rng=None, base_nodes=64, schedule="luby", factor=1.5,
+                        max_restarts=None, deadline=None, stats=None, cancel=None):
+    """Randomized bitmask search restarted with a fresh digit order whenever a node cutoff is hit.
 
+    Cutoffs follow ``base_nodes`` times the Luby sequence, or grow by ``factor``
+    each run with ``schedule="geometric"``. The digit order comes from ``rng``
+    or a random.Random seeded with ``seed``, so seeded runs are reproducible.
+    Raises SearchAborted("max_restarts") once ``max_restarts`` runs are spent.
+    """
+    rng = rng or random.Random(seed)
+    start = time.perf_counter()
+    bb = BitBoard(board)
+    if not bb.valid:
         return False
+    try:
+        run = 0
+        while max_restarts is None or run <= max_restarts:
+            run += 1
+            if schedule == "luby":
+                cutoff = base_nodes * luby(run)
+            else:
+                cutoff = int(base_nodes * factor ** (run - 1))
+            try:
+                solved = _search(bb, rng, deadline, stats, cutoff, cancel)
+            except SearchAborted as e:
+                if e.reason != "max_nodes":
+                    raise
+                bb.undo(0)
+                if stats is not None:
+                    stats.restarts += 1
+                continue
+            if solved:
+                bb.to_board(board)
+            return solved
+        raise SearchAborted("max_restarts")
+    finally:
+        if stats is not None:
+            stats.wall_time += time.perf_counter() - start
+
+
+def _count(bb, limit, stats=None, depth=0):
+    mark = len(bb.trail)
+    ok = bb.propagate()
+    if stats is not None:
+        stats.enter(depth)
+        stats.propagations += len(bb.trail) - mark
+    if not ok:
+        bb.undo(mark)
+        return 0
+    i = bb.most_constrained()
+    if i is None:
+        bb.undo(mark)
+        return 1
+
+    total = 0
+    nums = _DIGITS[bb.candidates(i)]
+    for num in nums:
+        inner = len(bb.trail)
+        bb.place(i, num)
+        if stats is not None:
+            stats.guesses += len(nums) > 1
+        total += _count(bb, None if limit is None else limit - total, stats, depth + 1)
+        bb.undo(inner)
+        if limit is not None and total >= limit:
+            break
+        if stats is not None:
+            stats.backtracks += 1
+
+    bb.undo(mark)
+    return total
+
+
+def count_solutions(board, limit=2, stats=None):
+    """Count solutions of ``board`` without modifying it, stopping at ``limit`` (None for all)."""
+    start = time.perf_counter()
+    bb = BitBoard(board)
+    total = _count(bb, limit, stats) if bb.valid else 0
+    if stats is not None:
+        stats.wall_time += time.perf_counter() - start
+    return total
+
+
+def _solutions(bb):
+    mark = len(bb.trail)
+    if not bb.propagate():
+        bb.undo(mark)
+        return
+    i = bb.most_constrained()
+    if i is None:
+        yield list(bb.cells)
+        bb.undo(mark)
+        return
+
+    for num in _DIGITS[bb.candidates(i)]:
+        inner = len(bb.trail)
+        bb.place(i, num)
+        yield from _solutions(bb)
+        bb.undo(inner)
+    bb.undo(mark)
+
+
+def _split(board, target):
+    """Expand the search tree breadth-first into at least ``target`` independent subproblems.
+
+    Returns (subproblems, solved) where each subproblem is a flat 81-cell list
+    with one more cell fixed than its parent, and ``solved`` holds complete
+    grids reached while splitting.
+    """
+    frontier = [[v for row in board for v in row]]
+    solved = []
+    while len(frontier) < target:
+        expanded = []
+        grew = False
+        for cells in frontier:
+            bb = BitBoard([cells[r * 9:r * 9 + 9] for r in range(9)])
+            if not bb.valid or not bb.propagate():
+                continue
+            i = bb.most_constrained()
+            if i is None:
+                solved.append(list(bb.cells))
+                continue
+            for num in _DIGITS[bb.candidates(i)]:
+                child = list(bb.cells)
+                child[i] = num
+                expanded.append(child)
+            grew = True
+        frontier = expanded
+        if not grew:
+            break
+    # Biggest subtrees (most empty cells) first so the pool's tail is short.
+    frontier.sort(key=lambda cells: cells.count(0), reverse=True)
+    return frontier, solved
+
+
+def _subtree_task(task):
+    cells, limit, collect = task
+    bb = BitBoard([cells[r * 9:r * 9 + 9] for r in range(9)])
+    if not bb.valid:
+        return 0, []
+    if collect:
+        found = list(itertools.islice(_solutions(bb), limit))
+        return len(found), found
+    return _count(bb, limit), []
+
+
+def _parallel_search(board, limit, workers, collect):
+    workers = workers or os.cpu_count() or 1
+    subproblems, solved = _split(board, workers * 16)
+    total = len(solved)
+    found = solved if collect else []
+    tasks = [(cells, limit, collect) for cells in subproblems]
+    if workers == 1:
+        results = map(_subtree_task, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers)
+        # chunksize=1 lets idle workers pull the next subtree as soon as they finish.
+        results = pool.imap_unordered(_subtree_task, tasks, 1)
+    try:
+        for count, solutions in results:
+            if limit is not None and total >= limit:
+                break
+            total += count
+            found.extend(solutions)
+    finally:
+        if pool is not None:
+            pool.terminate()
+    if limit is not None:
+        total = min(total, limit)
+        found = found[:limit]
+    return total, found
+
+
+def count_solutions_parallel(board, limit=None, workers=None):
+    """Count solutions by splitting the search tree into subtrees spread over a process pool."""
+    return _parallel_search(board, limit, workers, False)[0]
+
+
+def find_solutions_parallel(board, limit=None, workers=None):
+    """Like count_solutions_parallel but returns the solutions as 9x9 boards."""
+    found = _parallel_search(board, limit, workers, True)[1]
+    return [[cells[r * 9:r * 9 + 9] for r in range(9)] for cells in found]
+
+
+def has_unique_solution(board):
+    return count_solutions(board, limit=2) == 1
+
+
+class DancingLinks:
+    """Knuth's Algorithm X over the 324-column Sudoku exact-cover matrix.
+
+    Columns are cell, row-digit, column-digit and box-digit constraints; each
+    of the 729 rows places one digit in one cell. Givens are selected up front.
+    """
+
+    def __init__(self, board):
+        size = 325 + 729 * 4
+        self.L = [0] * size
+        self.R = [0] * size
+        self.U = [0] * size
+        self.D = [0] * size
+        self.C = [0] * size
+        self.row_of = [0] * size
+        self.S = [0] * 325
+        L, R, U, D, C = self.L, self.R, self.U, self.D, self.C
+        for h in range(325):
+            L[h] = h - 1 if h else 324
+            R[h] = h + 1 if h < 324 else 0
+            U[h] = D[h] = C[h] = h
+
+        self.row_start = [0] * 729
+        n = 325
+        for i in range(81):
+            r, c, b = _ROW[i], _COL[i], _BOX[i]
+            for d in range(9):
+                row = i * 9 + d
+                cols = (1 + i, 82 + r * 9 + d, 163 + c * 9 + d, 244 + b * 9 + d)
+                self.row_start[row] = n
+                for k, col in enumerate(cols):
+                    C[n] = col
+                    self.row_of[n] = row
+                    U[n] = U[col]
+                    D[n] = col
+                    D[U[col]] = n
+                    U[col] = n
+                    self.S[col] += 1
+                    L[n] = n - 1 if k else n + 3
+                    R[n] = n + 1 if k < 3 else n - 3
+                    n += 1
+
+        self.givens = []
+        self.valid = True
+        covered = set()
+        for i in range(81):
+            num = board[_ROW[i]][_COL[i]]
+            if not num:
+                continue
+            row = i * 9 + num - 1
+            self.givens.append(row)
+            start = self.row_start[row]
+            j = start
+            while True:
+                if C[j] in covered:
+                    self.valid = False
+                    return
+                covered.add(C[j])
+                self.cover(C[j])
+                j = R[j]
+                if j == start:
+                    break
+
+    def cover(self, c):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        R[L[c]] = R[c]
+        L[R[c]] = L[c]
+        i = D[c]
+        while i != c:
+            j = R[i]
+            while j != i:
+                U[D[j]] = U[j]
+                D[U[j]] = D[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def uncover(self, c):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[c]
+        while i != c:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                U[D[j]] = j
+                D[U[j]] = j
+                j = L[j]
+            i = U[i]
+        R[L[c]] = c
+        L[R[c]] = c
+
+    def search(self, limit=None, deadline=None, stats=None, max_nodes=None, cancel=None):
+        """Return (count, first_solution_rows), stopping once ``limit`` solutions are found."""
+        L, R, D, C, S = self.L, self.R, self.D, self.C, self.S
+        budgeted = deadline is not None or max_nodes is not None or cancel is not None
+        partial = []
+        found = [0, None]
+        nodes = [0]
+
+        def recurse(depth):
+            if budgeted:
+                nodes[0] += 1
+                _check_budget(nodes[0], deadline, max_nodes, cancel)
+            if stats is not None:
+                stats.enter(depth)
+            if R[0] == 0:
+                found[0] += 1
+                if found[1] is None:
+                    found[1] = list(partial)
+                return limit is not None and found[0] >= limit
+
+            c, best = 0, 10
+            j = R[0]
+            while j:
+                if S[j] < best:
+                    c, best = j, S[j]
+                    if best <= 1:
+                        break
+                j = R[j]
+            if best == 0:
+                return False
+
+            self.cover(c)
+            stop = False
+            r = D[c]
+            while r != c and not stop:
+                row = self.row_of[r]
+                partial.append(row)
+                if stats is not None:
+                    stats.guesses += best > 1
+                    stats.placed(_ROW[row // 9], _COL[row // 9], row % 9 + 1)
+                j = R[r]
+                while j != r:
+                    self.cover(C[j])
+                    j = R[j]
+                stop = recurse(depth + 1)
+                j = L[r]
+                while j != r:
+                    self.uncover(C[j])
+                    j = L[j]
+                partial.pop()
+                if stats is not None and not stop:
+                    stats.backtracks += 1
+                    stats.removed(_ROW[row // 9], _COL[row // 9], row % 9 + 1)
+                r = D[r]
+            self.uncover(c)
+            return stop
+
+        if self.valid:
+            recurse(0)
+        return found[0], found[1]
+
+
+def solve_board_dlx(board, deadline=None, stats=None, max_nodes=None, cancel=None):
+    start = time.perf_counter()
+    try:
+        dlx = DancingLinks(board)
+        count, rows = dlx.search(1, deadline, stats, max_nodes, cancel)
+        if not count:
+            return False
+        for row in rows:
+            i, d = divmod(row, 9)
+            board[_ROW[i]][_COL[i]] = d + 1
+        return True
+    finally:
+        if stats is not None:
+            stats.wall_time += time.perf_counter() - start
+
+
+def count_solutions_dlx(board, limit=None, stats=None):
+    return DancingLinks(board).search(limit, stats=stats)[0]
+
+
+BACKENDS = {
+    "bitmask": solve_board_bitmask,
+    "dlx": solve_board_dlx,
+}
+
+
+class SolutionCache:
+    """Bounded LRU map from puzzle to solution.
+
+    Keys are the 81 cell values as bytes, or the canonical form of the board
+    when ``canonical`` is set so that equivalent puzzles share one entry. With
+    ``path`` the cache is loaded from disk on creation and saved at exit.
+    """
+
+    def __init__(self, capacity=1024, canonical=False, path=None):
+        self.capacity = capacity
+        self.canonical = canonical
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if path:
+            if os.path.exists(path):
+                self.load(path)
+            atexit.register(self.save)
+
+    def solve(self, board, backend="bitmask", stats=None, **budget):
+        transform = None
+        key_board = board
+        if self.canonical:
+            key_board, transform = canonical_form(board)
+        key = bytes(v for row in key_board for v in row)
+
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            solution = self.entries[key]
+        else:
+            self.misses += 1
+            work = [row[:] for row in key_board]
+            solved = BACKENDS[backend](work, stats=stats, **budget)
+            solution = bytes(v for row in work for v in row) if solved else None
+            self._store(key, solution)
+
+        if solution is None:
+            return False
+        solved = [list(solution[r * 9:r * 9 + 9]) for r in range(9)]
+        if transform is not None:
+            solved = invert_transform(solved, transform)
+        for i in range(9):
+            board[i][:] = solved[i]
+        return True
+
+    def _store(self, key, solution):
+        self.entries[key] = solution
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self):
+        return {"size": len(self.entries), "capacity": self.capacity,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def clear(self):
+        self.entries.clear()
+
+    def load(self, path):
+        """Add the entries saved at ``path``; malformed lines are skipped."""
+        with open(path, errors="replace") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) != 2 or len(parts[0]) != 81 or not parts[0].isdecimal():
+                    continue
+                if parts[1] != "-" and (len(parts[1]) != 81 or not parts[1].isdecimal()):
+                    continue
+                key = bytes(int(ch) for ch in parts[0])
+                self._store(key, None if parts[1] == "-" else bytes(int(ch) for ch in parts[1]))
+
+    def save(self, path=None):
+        path = path or self.path
+        if not path:
+            return
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            for key, solution in self.entries.items():
+                value = "-" if solution is None else "".join(map(str, solution))
+                f.write("".join(map(str, key)) + " " + value + "\n")
+        os.replace(tmp, path)
+
+
+default_cache = SolutionCache(path=os.environ.get("SUDOKU_CACHE"))
+
+
+def solve_board(board, backend="bitmask", cache=None, stats=None):
+    if cache is not None:
+        return cache.solve(board, backend, stats)
+    return BACKENDS[backend](board, stats=stats)
+
+
+SolveOutcome = namedtuple("SolveOutcome", ["status", "reason"])
+
+
+def solve_iterative(board, max_nodes=None, deadline=None, cancel=None, backend="bitmask", cache=None, stats=None):
+    """Solve ``board`` in place under a node budget, a monotonic ``deadline`` and a cancel token.
+
+    ``cancel`` is a threading.Event (anything with ``is_set()``). Returns a
+    SolveOutcome whose status is "solved", "unsolvable" or "gave_up"; when the
+    search gives up, ``reason`` is "max_nodes", "deadline" or "cancelled" and
+    the board is left untouched.
+    """
+    budget = {"deadline": deadline, "max_nodes": max_nodes, "cancel": cancel}
+    try:
+        if cache is not None:
+            solved = cache.solve(board, backend, stats, **budget)
+        else:
+            solved = BACKENDS[backend](board, stats=stats, **budget)
+    except SearchAborted as e:
+        return SolveOutcome("gave_up", e.reason)
+    return SolveOutcome("solved" if solved else "unsolvable", None)
+
+
+# How often solve_portfolio checks its cancel event, node counters and racer processes.
+CANCEL_POLL = 0.05
+
+PORTFOLIO = [
+    ("mrv", "bitmask", {}),
+    ("dlx", "dlx", {}),
+    ("restarts-1", "restarts", {"seed": 1}),
+    ("restarts-2", "restarts", {"seed": 2, "schedule": "geometric"}),
+    ("restarts-3", "restarts", {"seed": 3, "base_nodes": 256}),
+]
+
+
+def _run_strategy(kind, board, **kwargs):
+    if kind == "restarts":
+        return solve_with_restarts(board, **kwargs)
+    return BACKENDS[kind](board, **kwargs)
+
+
+class _SharedNodeStats(SolveStats):
+    """SolveStats that mirrors its node count into one slot of a shared array."""
+
+    def __init__(self, counters, slot):
+        super().__init__()
+        self.counters = counters
+        self.slot = slot
+
+    def enter(self, depth):
+        super().enter(depth)
+        self.counters[self.slot] = self.nodes
+
 
-    yield from backtrack()
+def _portfolio_worker(slot, kind, kwargs, puzzle, results, counters=None):
+    board = [row[:] for row in puzzle]
+    if counters is not None:
+        kwargs = dict(kwargs, stats=_SharedNodeStats(counters, slot))
+    try:
+        solved = _run_strategy(kind, board, **kwargs)
+    except Exception:
+        results.put((slot, None, None))
+        return
+    results.put((slot, solved, board if solved else None))
 
-def solve_gui_board(gui_cells):
+
+def _portfolio_context():
+    # Racers may be started from a worker thread of a Tk process, where fork
+    # is unsafe; forkserver (or spawn where it is missing) starts them clean.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def solve_portfolio(board, strategies=None, timeout=None, workers=None, cancel=None, stats=None):
+    """Race differently configured solvers in separate processes and keep the first answer.
+
+    ``strategies`` is a list of (name, kind, kwargs) like PORTFOLIO, where kind
+    is a BACKENDS key or "restarts". The board is filled in place when solved
+    and the losing processes are terminated. Returns a SolveOutcome whose
+    ``reason`` names the winning strategy, or "deadline" if ``timeout`` passed
+    and "cancelled" once the ``cancel`` event is set. While waiting,
+    ``stats.nodes`` is kept up to date with the nodes searched by all racers.
+    A racer that dies without reporting counts as finished, and "error" is
+    returned when no racer reports an answer.
+    """
+    workers = workers or os.cpu_count() or 1
+    strategies = (strategies or PORTFOLIO)[:max(1, workers)]
+    deadline = None if timeout is None else time.monotonic() + timeout
+    if len(strategies) == 1:
+        name, kind, kwargs = strategies[0]
+        try:
+            solved = _run_strategy(kind, board, deadline=deadline, cancel=cancel, stats=stats, **kwargs)
+        except SearchAborted as e:
+            return SolveOutcome("gave_up", e.reason)
+        return SolveOutcome("solved" if solved else "unsolvable", name)
+
+    ctx = _portfolio_context()
+    results = ctx.Queue()
+    counters = None
+    if stats is not None:
+        counters = ctx.Array("q", len(strategies), lock=False)
+        base_nodes = stats.nodes
+    processes = [ctx.Process(target=_portfolio_worker,
+                             args=(slot, kind, kwargs, board, results, counters), daemon=True)
+                 for slot, (_, kind, kwargs) in enumerate(strategies)]
+    for p in processes:
+        p.start()
+    try:
+        finished = set()
+        while len(finished) < len(processes):
+            if counters is not None:
+                stats.nodes = base_nodes + sum(counters)
+            if cancel is not None and cancel.is_set():
+                return SolveOutcome("gave_up", "cancelled")
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return SolveOutcome("gave_up", "deadline")
+            wait = CANCEL_POLL if remaining is None else min(CANCEL_POLL, remaining)
+            try:
+                slot, solved, solution = results.get(timeout=wait)
+            except queue.Empty:
+                # A clean exit always posts first; a non-zero exit code means
+                # the racer was killed or crashed before it could.
+                finished.update(k for k, p in enumerate(processes) if p.exitcode not in (None, 0))
+                continue
+            finished.add(slot)
+            if solved is None:
+                continue
+            if solved:
+                for i in range(9):
+                    board[i][:] = solution[i]
+            return SolveOutcome("solved" if solved else "unsolvable", strategies[slot][0])
+        return SolveOutcome("gave_up", "error")
+    finally:
+        if counters is not None:
+            stats.nodes = base_nodes + sum(counters)
+        for p in processes:
+            if p.is_alive():
+                p.terminate()
+        for p in processes:
+            p.join()
+
+
+def solve_batch(boards):
+    """Solve many boards in place, propagating singles across all of them at once.
+
+    Boards are held as an (N, 81) uint8 grid with (N, 27) uint16 unit masks so
+    naked and hidden singles are found with vectorized bit operations. Boards
+    still undecided once propagation stalls fall back to solve_board_bitmask.
+    Returns a list of booleans, one per board.
+    """
+    import numpy as np
+
+    n = len(boards)
+    if not n:
+        return []
+    grid = np.array([[v for row in b for v in row] for b in boards], dtype=np.uint8).reshape(n, 81)
+    unit_cells = np.array(_UNITS)
+    cell_units = np.array([[_ROW[i], 9 + _COL[i], 18 + _BOX[i]] for i in range(81)])
+    bit_of = np.array([0] + [1 << d for d in range(9)], dtype=np.uint16)
+    count = np.array(_COUNT, dtype=np.uint8)
+    first = np.array([digits[0] if digits else 0 for digits in _DIGITS], dtype=np.uint8)
+    alive = np.ones(n, dtype=bool)
+
+    while True:
+        per_unit = bit_of[grid][:, unit_cells]
+        masks = np.bitwise_or.reduce(per_unit, axis=2)
+        alive &= (count[masks] == (per_unit != 0).sum(axis=2)).all(axis=1)
+
+        used = masks[:, cell_units[:, 0]] | masks[:, cell_units[:, 1]] | masks[:, cell_units[:, 2]]
+        cand = ~used & ALL_DIGITS
+        cand[grid != 0] = 0
+        alive &= ~((grid == 0) & (cand == 0)).any(axis=1)
+
+        cand_u = cand[:, unit_cells]
+        hidden = np.zeros_like(masks)
+        for d in range(9):
+            bit = 1 << d
+            places = ((cand_u >> d) & 1).sum(axis=2, dtype=np.uint8)
+            alive &= ~((places == 0) & ((masks & bit) == 0)).any(axis=1)
+            hidden |= np.where(places == 1, bit, 0).astype(np.uint16)
+        hidden = cand & (hidden[:, cell_units[:, 0]] | hidden[:, cell_units[:, 1]] | hidden[:, cell_units[:, 2]])
+        forced = np.where(count[cand] == 1, cand, hidden)
+
+        alive &= ~(count[forced] > 1).any(axis=1)
+        forced[~alive] = 0
+        if not forced.any():
+            break
+        grid = np.where(forced != 0, first[forced], grid)
+
+    results = []
+    for idx, board in enumerate(boards):
+        if not alive[idx]:
+            results.append(False)
+            continue
+        flat = grid[idx].tolist()
+        for i in range(81):
+            board[_ROW[i]][_COL[i]] = flat[i]
+        results.append(0 not in flat or solve_board_bitmask(board))
+    return results
+
+
+SolveResult = namedtuple("SolveResult", ["index", "status", "board", "stats"], defaults=(None,))
+
+
+def _solve_task(task):
+    index, puzzle, backend, timeout, collect_stats = task
+    if puzzle is None:
+        return SolveResult(index, "invalid", None, None)
+    board = [row[:] for row in puzzle]
+    deadline = None if timeout is None else time.monotonic() + timeout
+    stats = SolveStats() if collect_stats else None
+    try:
+        if BACKENDS[backend](board, deadline, stats):
+            return SolveResult(index, "solved", board, stats)
+        return SolveResult(index, "unsolvable", None, stats)
+    except SolveTimeout:
+        return SolveResult(index, "timeout", None, stats)
+
+
+def solve_many(puzzles, workers=None, chunksize=16, timeout=None, ordered=True, backend="bitmask",
+               collect_stats=False):
+    """Solve an iterable of boards across a process pool, yielding SolveResults.
+
+    With ``ordered=False`` results stream back as soon as each chunk finishes;
+    ``index`` always refers to the puzzle's position in the input. The input is
+    consumed in bounded windows, so arbitrarily long streams use constant memory.
+    A None puzzle (an unparseable input line) yields an "invalid" result. With
+    ``collect_stats`` each result carries the SolveStats of its search.
+    """
+    tasks = ((index, puzzle, backend, timeout, collect_stats) for index, puzzle in enumerate(puzzles))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        yield from map(_solve_task, tasks)
+        return
+
+    window = workers * chunksize * 4
+    with multiprocessing.Pool(workers) as pool:
+        mapper = pool.imap if ordered else pool.imap_unordered
+        while True:
+            batch = list(itertools.islice(tasks, window))
+            if not batch:
+                break
+            yield from mapper(_solve_task, batch, chunksize)
+
+
+def parse_puzzle(text):
+    """Parse an 81-character line ('.' or '0' for blanks) into a board."""
+    text = text.strip()
+    if len(text) != 81 or any(ch not in ".0123456789" for ch in text):
+        raise ValueError(f"not an 81-character puzzle: {text[:20]!r}")
+    return [[int(ch) if ch != "." else 0 for ch in text[r * 9:r * 9 + 9]] for r in range(9)]
+
+
+def format_board(board):
+    return "".join(str(v) for row in board for v in row)
+
+
+def solve_gui_board(gui_cells, backend="bitmask", cache=default_cache, stats=None):
     board = [[0 for _ in range(9)] for _ in range(9)]
 
     for i in range(9):
@@ -76,7 +1043,7 @@ def solve_gui_board(gui_cells):
             if val.isdigit():
                 board[i][j] = int(val)
 
-    if solve_board(board):
+    if solve_board(board, backend, cache, stats):
         for i in range(9):
             for j in range(9):
                 gui_cells[i][j].delete(0, 'end')
@@ -85,16 +1052,70 @@ def solve_gui_board(gui_cells):
     else:
         return False
 
-def generate_random_puzzle(given=None):
-    board = [[0 for _ in range(9)] for _ in range(9)]
-    solve_board(board)
+GeneratedPuzzle = namedtuple("GeneratedPuzzle", ["puzzle", "solution", "clues", "attempts"])
+
+
+def _dig(solution, rng, target_clues, deadline, symmetric):
+    """One removal pass over ``solution`` in a random cell order; returns (puzzle, clues, attempts)."""
+    puzzle = [row[:] for row in solution]
+    cells = list(range(81))
+    rng.shuffle(cells)
+    if symmetric:
+        groups = [(i, 80 - i) if i != 40 else (i,) for i in cells if i <= 40]
+    else:
+        groups = [(i,) for i in cells]
+
+    clues = 81
+    attempts = 0
+    for group in groups:
+        if clues <= target_clues or (deadline is not None and time.monotonic() > deadline):
+            break
+        if clues - len(group) < target_clues and len(group) > 1:
+            continue
+        attempts += 1
+        for i in group:
+            puzzle[_ROW[i]][_COL[i]] = 0
+        if count_solutions(puzzle, limit=2) == 1:
+            clues -= len(group)
+        else:
+            for i in group:
+                puzzle[_ROW[i]][_COL[i]] = solution[_ROW[i]][_COL[i]]
+    return puzzle, clues, attempts
 
-    if given is None:
-        given = random.randint(17, 30)
 
-    cells_to_keep = random.sample([(i, j) for i in range(9) for j in range(9)], given)
-    puzzle = [[0 for _ in range(9)] for _ in range(9)]
-    for i, j in cells_to_keep:
-        puzzle[i][j] = board[i][j]
+def generate_unique_puzzle(target_clues=24, time_budget=1.0, symmetric=False, seed=None):
+    """Dig clues out of a random full grid while the puzzle keeps a unique solution.
 
-    return puzzle
+    Cells whose removal would allow a second solution are never retried, since
+    removing further clues can only add solutions. With ``symmetric`` clues are
+    removed in 180-degree rotational pairs. A pass that stops above
+    ``target_clues`` is retried on a fresh grid until the target is met or
+    ``time_budget`` seconds have passed, keeping the puzzle with the fewest
+    clues; with no budget a single pass is made. ``attempts`` counts tried
+    removals over all passes. Full grids come from solve_with_restarts, so
+    generation latency stays flat, and a ``seed`` makes the whole puzzle
+    reproducible.
+    """
+    rng = random.Random(seed)
+    deadline = None if time_budget is None else time.monotonic() + time_budget
+    best = None
+    attempts = 0
+    while True:
+        solution = [[0 for _ in range(9)] for _ in range(9)]
+        solve_with_restarts(solution, rng=rng)
+        puzzle, clues, tried = _dig(solution, rng, target_clues, deadline, symmetric)
+        attempts += tried
+        if best is None or clues < best[2]:
+            best = (puzzle, solution, clues)
+        if clues <= target_clues or deadline is None or time.monotonic() > deadline:
+            break
+
+    return GeneratedPuzzle(*best, attempts)
+
+
+def generate_random_puzzle(given=None, bank=None, tier=None):
+    if bank is not None and tier in bank:
+        return bank.random(tier).puzzle
+    if given is None:
+        given = random.randint(17, 30)
+    return generate_unique_puzzle(given).puzzle
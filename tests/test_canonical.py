@@ -0,0 +1,52 @@
+import random
+
+from canonical import Transform, apply_transform, canonical_form, invert_transform
+from solver import SolutionCache
+
+IDENTITY = Transform(False, tuple(range(9)), tuple(range(9)), tuple(range(10)))
+PUZZLE = ".......1.4.........2...........5.4.7..8...3....1.9....3..4..2...5.1........8.6..."
+
+
+def parse(text):
+    return [[int(ch) if ch.isdigit() else 0 for ch in text[r * 9:r * 9 + 9]] for r in range(9)]
+
+
+def shuffled(board, rng):
+    bands = rng.sample(range(3), 3)
+    rows = [b * 3 + r for b in bands for r in rng.sample(range(3), 3)]
+    stacks = rng.sample(range(3), 3)
+    cols = [s * 3 + c for s in stacks for c in rng.sample(range(3), 3)]
+    digits = [0] + rng.sample(range(1, 10), 9)
+    out = [[digits[board[r][c]] for c in cols] for r in rows]
+    return [list(col) for col in zip(*out)] if rng.random() < 0.5 else out
+
+
+def test_equivalent_puzzles_share_a_form():
+    board = parse(PUZZLE)
+    form, transform = canonical_form(board)
+    assert apply_transform(board, transform) == form
+    assert invert_transform(form, transform) == board
+    rng = random.Random(1)
+    for _ in range(5):
+        assert canonical_form(shuffled(board, rng))[0] == form
+
+
+def test_empty_board_falls_back_to_identity():
+    empty = [[0] * 9 for _ in range(9)]
+    form, transform = canonical_form(empty)
+    assert transform == IDENTITY
+    assert form == empty
+
+
+def test_one_clue_board_falls_back_to_identity():
+    board = [[0] * 9 for _ in range(9)]
+    board[4][4] = 5
+    form, transform = canonical_form(board)
+    assert transform == IDENTITY
+    assert form == board
+
+
+def test_cache_solves_empty_board():
+    board = [[0] * 9 for _ in range(9)]
+    assert SolutionCache(canonical=True).solve(board)
+    assert all(sorted(row) == list(range(1, 10)) for row in board)
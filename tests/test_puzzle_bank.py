@@ -0,0 +1,56 @@
+import pytest
+
+from puzzle_bank import PuzzleBank, open_bank, write_bank
+from solver import parse_puzzle, solve_board_bitmask
+
+PUZZLES = [
+    "86...9..34913.25..5.3.4.91.....8..9.93..1.7.2.4896..3.1..8....93..7...5..7.....24",
+    ".5641.......7..56.84..6.9.24..3.6..8...29..532.5...64.682.35...5..82...631...7...",
+    ".......1.4.........2...........5.4.7..8...3....1.9....3..4..2...5.1........8.6...",
+]
+
+
+def records(texts, rating=0):
+    out = []
+    for k, text in enumerate(texts):
+        puzzle = parse_puzzle(text)
+        solution = [row[:] for row in puzzle]
+        assert solve_board_bitmask(solution)
+        out.append((puzzle, solution, rating + k))
+    return out
+
+
+@pytest.mark.parametrize("packed", [True, False])
+def test_round_trip(tmp_path, packed):
+    path = str(tmp_path / "test.bank")
+    easy = records(PUZZLES[:2])
+    hard = records(PUZZLES[2:], rating=300)
+    assert write_bank(path, [("Easy", iter(easy)), ("Empty", []), ("Hard", hard)], packed=packed) == 3
+
+    with PuzzleBank(path) as bank:
+        assert bank.packed == packed
+        assert len(bank) == 3
+        assert bank.tiers == {"Easy": (0, 2), "Empty": (2, 0), "Hard": (2, 1)}
+        assert "Easy" in bank and "Hard" in bank
+        assert "Empty" not in bank and "Missing" not in bank
+        for index, (puzzle, solution, rating) in enumerate(easy + hard):
+            entry = bank.get(index)
+            assert entry.puzzle == puzzle
+            assert entry.solution == solution
+            assert entry.rating == min(255, rating)
+        assert bank.random("Hard").puzzle == hard[0][0]
+        with pytest.raises(KeyError):
+            bank.random("Empty")
+        with pytest.raises(IndexError):
+            bank.get(3)
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bank"
+    path.write_bytes(b"not a bank at all")
+    with pytest.raises(ValueError):
+        PuzzleBank(str(path))
+
+
+def test_open_missing_bank(tmp_path):
+    assert open_bank(str(tmp_path / "missing.bank")) is None
@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+from solve_trace import SolveTrace, record_trace
+from solver import parse_puzzle
+
+PUZZLE = "8..........36......7..9.2...5...7.......457.....1...3...1....68..85...1..9....4.."
+
+
+def test_replay_reaches_solution():
+    board = parse_puzzle(PUZZLE)
+    trace = record_trace(board)
+    assert trace.solved and trace.truncated is None
+    assert trace.start_board() == board
+    final = trace.board_at(len(trace))
+    assert all(all(row) for row in final)
+    cells = [row[:] for row in board]
+    for kind, r, c, num in trace:
+        cells[r][c] = num if kind == "place" else 0
+    assert cells == final
+
+
+def test_save_load_round_trip(tmp_path):
+    trace = record_trace(parse_puzzle(PUZZLE), interval=64)
+    path = str(tmp_path / "solve.trace")
+    trace.save(path)
+    loaded = SolveTrace.load(path)
+    assert loaded.start == trace.start
+    assert list(loaded.events) == list(trace.events)
+    assert loaded.solved and loaded.interval == 64
+    assert loaded.board_at(len(loaded) // 2) == trace.board_at(len(trace) // 2)
+
+
+def test_truncation_reason_survives_reload(tmp_path):
+    cancel = threading.Event()
+    cancel.set()
+    for trace, reason in [(record_trace(parse_puzzle(PUZZLE), max_nodes=50), "max_nodes"),
+                          (record_trace(parse_puzzle(PUZZLE), cancel=cancel), "cancelled")]:
+        assert trace.truncated == reason and not trace.solved
+        path = str(tmp_path / f"{reason}.trace")
+        trace.save(path)
+        assert SolveTrace.load(path).truncated == reason
+
+
+@pytest.mark.parametrize("damage", ["short", "magic", "cut", "cell"])
+def test_corrupt_files_raise_value_error(tmp_path, damage):
+    path = tmp_path / "bad.trace"
+    record_trace(parse_puzzle(PUZZLE)).save(str(path))
+    data = bytearray(path.read_bytes())
+    if damage == "short":
+        data = data[:3]
+    elif damage == "magic":
+        data[:4] = b"XXXX"
+    elif damage == "cut":
+        data = data[:-1]
+    else:
+        data[-2:] = b"\xff\x07"
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        SolveTrace.load(str(path))
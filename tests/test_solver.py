@@ -0,0 +1,144 @@
+import glob
+import os
+import threading
+
+import pytest
+
+from solver import (BitBoard, SolutionCache, count_solutions, count_solutions_dlx, parse_puzzle,
+                    solve_board_bitmask, solve_board_dlx, solve_iterative)
+
+BENCHMARKS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+
+
+def load_benchmarks():
+    puzzles = []
+    for path in sorted(glob.glob(os.path.join(BENCHMARKS, "*.txt"))):
+        with open(path) as f:
+            puzzles += [line for line in f if line.strip() and not line.startswith("#")]
+    return puzzles
+
+
+PUZZLES = load_benchmarks()
+HARD = PUZZLES[-1]
+
+
+def is_solution(board, puzzle):
+    units = [board[r] for r in range(9)]
+    units += [[board[r][c] for r in range(9)] for c in range(9)]
+    units += [[board[r][c] for r in range(b // 3 * 3, b // 3 * 3 + 3) for c in range(b % 3 * 3, b % 3 * 3 + 3)]
+              for b in range(9)]
+    if any(sorted(unit) != list(range(1, 10)) for unit in units):
+        return False
+    return all(not v or v == board[r][c] for r, row in enumerate(puzzle) for c, v in enumerate(row))
+
+
+def conflicting():
+    board = [[0] * 9 for _ in range(9)]
+    board[0][0] = board[0][5] = 5
+    return board
+
+
+def no_place_for_one():
+    # Every cell is locally fine, but rows 0-1 and columns 0-1 already hold a 1
+    # outside box 0 and (2, 2) is taken, so box 0 has nowhere for its 1.
+    board = [[0] * 9 for _ in range(9)]
+    board[0][3] = board[1][6] = board[3][0] = board[6][1] = 1
+    board[2][2] = 5
+    return board
+
+
+def test_benchmarks_found():
+    assert len(PUZZLES) > 100
+
+
+@pytest.mark.parametrize("text", PUZZLES)
+def test_backends_agree(text):
+    puzzle = parse_puzzle(text)
+    bitmask = [row[:] for row in puzzle]
+    dlx = [row[:] for row in puzzle]
+    assert solve_board_bitmask(bitmask)
+    assert solve_board_dlx(dlx)
+    assert is_solution(bitmask, puzzle)
+    assert bitmask == dlx
+    assert count_solutions(puzzle) == 1
+    assert count_solutions_dlx(puzzle, limit=2) == 1
+
+
+@pytest.mark.parametrize("make", [conflicting, no_place_for_one])
+def test_unsolvable_boards(make):
+    board = make()
+    for solve in (solve_board_bitmask, solve_board_dlx):
+        work = [row[:] for row in board]
+        assert not solve(work)
+        assert work == board
+    assert count_solutions(board) == 0
+    assert count_solutions_dlx(board) == 0
+
+
+def test_conflicting_givens_are_invalid():
+    assert not BitBoard(conflicting()).valid
+    assert BitBoard(no_place_for_one()).valid
+
+
+def test_empty_board_has_many_solutions():
+    assert count_solutions([[0] * 9 for _ in range(9)], limit=5) == 5
+
+
+@pytest.mark.parametrize("backend", ["bitmask", "dlx"])
+def test_iterative_gives_up_without_touching_board(backend):
+    puzzle = parse_puzzle(HARD)
+    board = [row[:] for row in puzzle]
+    outcome = solve_iterative(board, max_nodes=1, backend=backend)
+    assert outcome == ("gave_up", "max_nodes")
+    assert board == puzzle
+
+    cancel = threading.Event()
+    cancel.set()
+    outcome = solve_iterative(board, cancel=cancel, backend=backend)
+    assert outcome == ("gave_up", "cancelled")
+    assert board == puzzle
+
+
+def test_iterative_through_cache_gives_up_without_touching_board():
+    puzzle = parse_puzzle(HARD)
+    board = [row[:] for row in puzzle]
+    cache = SolutionCache()
+    assert solve_iterative(board, max_nodes=1, cache=cache).status == "gave_up"
+    assert board == puzzle
+    assert solve_iterative(board, cache=cache).status == "solved"
+    assert is_solution(board, puzzle)
+
+
+def test_solve_batch_matches_bitmask():
+    pytest.importorskip("numpy")
+    from solver import solve_batch
+
+    boards = [parse_puzzle(text) for text in PUZZLES[:40]] + [conflicting(), no_place_for_one()]
+    expected = []
+    for board in boards:
+        work = [row[:] for row in board]
+        expected.append((solve_board_bitmask(work), work))
+    results = solve_batch(boards)
+    assert results == [ok for ok, _ in expected]
+    for board, (ok, work) in zip(boards, expected):
+        if ok:
+            assert board == work
+
+
+def test_cache_load_skips_malformed_lines(tmp_path):
+    puzzle = parse_puzzle(HARD)
+    board = [row[:] for row in puzzle]
+    path = str(tmp_path / "solutions.cache")
+    cache = SolutionCache(path=path)
+    assert cache.solve(board)
+    cache.save()
+    with open(path, "a") as f:
+        f.write("x" * 81 + " -\n")
+        f.write("0" * 81 + " " + "y" * 81 + "\n")
+        f.write("garbage\n")
+
+    reloaded = SolutionCache(path=path)
+    assert len(reloaded.entries) == 1
+    work = [row[:] for row in puzzle]
+    assert reloaded.solve(work) and work == board
+    assert reloaded.hits == 1